@@ -2,65 +2,214 @@
 Agent Manager for PharmQAgentAI
 Coordinates AI agents for pharmaceutical research
 """
+import asyncio
+import atexit
+import itertools
+import json
 import logging
-from typing import Dict, Any, List, Optional
+import random
+import sys
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+_randint = random.randint
+_uniform = random.uniform
+_choice = random.choice
+
+# Upper bound on agent workflows running at once in batch execution
+MAX_PARALLEL_AGENTS = 8
+# Total wait budget for all agents of one scatter/gather call
+AGENT_TIMEOUT_SECONDS = 60
+# Maximum number of memoized results kept for deterministic workflows
+RESULT_CACHE_SIZE = 1024
+
+
+class _TimeCache:
+    """Wall-clock timestamps refreshed at most once per millisecond"""
+    
+    __slots__ = ("_cached",)
+    
+    def __init__(self):
+        self._cached = (0.0, "", "")
+    
+    def now(self) -> Tuple[str, str]:
+        """Return (workflow id stamp, ISO timestamp) for the current time"""
+        cached = self._cached
+        t = time.time()
+        if t - cached[0] > 0.001:
+            now = datetime.fromtimestamp(t)
+            cached = (
+                t,
+                f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}",
+                now.isoformat()
+            )
+            self._cached = cached
+        return cached[1], cached[2]
+
+
+_time_cache = _TimeCache()
+# Disambiguates workflow ids minted within the same second
+_workflow_counter = itertools.count(1)
+
+
+def _freeze_input(input_data: Dict[str, Any]) -> Any:
+    """Build a hashable cache key from workflow input data"""
+    try:
+        key = tuple(sorted(input_data.items()))
+        hash(key)
+        return key
+    except TypeError:
+        return json.dumps(input_data, sort_keys=True, default=str)
+
+
+# Static agent catalogue, built once at import and shared read-only by all instances
+_AGENT_CATALOGUE = {
+    "Workflow Automation": (
+        "Drug Pipeline Agent",
+        "Data Collection Agent",
+        "Quality Control Agent",
+        "Knowledge Update Agent"
+    ),
+    "Collaborative Research": (
+        "Collaboration Setup Agent",
+        "Market Analysis Agent",
+        "Patent Search Agent",
+        "Regulatory Compliance Agent"
+    ),
+    "Real-Time Intelligence": (
+        "Pattern Recognition Agent",
+        "Biomarker Discovery Agent",
+        "Safety Monitoring Agent",
+        "Clinical Insights Agent"
+    ),
+    "Advanced Analytics": (
+        "Document Processing Agent",
+        "Literature Analysis Agent",
+        "Data Mining Agent",
+        "Predictive Analytics Agent"
+    ),
+    "Multi-Modal Research": (
+        "Image Analysis Agent",
+        "Text Processing Agent",
+        "Molecular Visualization Agent",
+        "Report Generation Agent"
+    ),
+    "Decision Support": (
+        "Risk Assessment Agent",
+        "Treatment Optimization Agent",
+        "Drug Repurposing Agent",
+        "Clinical Decision Agent"
+    )
+}
+
+# Category and agent names are interned so every lookup table shares one string object per name
+_AVAILABLE_AGENTS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    sys.intern(category): tuple(sys.intern(agent_name) for agent_name in agent_names)
+    for category, agent_names in _AGENT_CATALOGUE.items()
+})
+
+# Reverse index and sorted category list derived once from the catalogue
+_AGENT_CATEGORY: Mapping[str, str] = MappingProxyType({
+    agent_name: category
+    for category, agent_names in _AVAILABLE_AGENTS.items()
+    for agent_name in agent_names
+})
+_AGENT_CATEGORIES: Tuple[str, ...] = tuple(sorted(_AVAILABLE_AGENTS))
+
+_AGENT_STATUS: Mapping[str, str] = MappingProxyType({
+    "system_status": "Active",
+    "total_agents": str(len(_AGENT_CATEGORY)),
+    "availability": "100%"
+})
+
 class AgentManager:
     """Manages AI agents for pharmaceutical research"""
     
-    def __init__(self):
+    __slots__ = (
+        "agents",
+        "agent_status",
+        "max_parallel_agents",
+        "timeout_seconds",
+        "_pool",
+        "_pool_lock",
+        "_result_cache",
+        "_result_cache_lock",
+        "_rng",
+        "_result_generators",
+        "_category_dispatch"
+    )
+    
+    def __init__(self, max_parallel_agents: int = MAX_PARALLEL_AGENTS,
+                 timeout_seconds: float = AGENT_TIMEOUT_SECONDS):
         """Initialize agent manager"""
-        self.logger = logging.getLogger(__name__)
         self.agents = {}
         self.agent_status = {}
-        self.logger.info("AI agents initialized with comprehensive ADK system")
+        self.max_parallel_agents = max_parallel_agents
+        self.timeout_seconds = timeout_seconds
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._result_cache: Dict[Tuple[str, str, Any], Dict[str, Any]] = {}
+        self._result_cache_lock = threading.Lock()
+        self._rng = np.random.default_rng()
+        self._result_generators = {
+            "Drug Pipeline Agent": self._drug_pipeline_results,
+            "Data Collection Agent": self._data_collection_results,
+            "Quality Control Agent": self._quality_control_results,
+            "Market Analysis Agent": self._market_analysis_results,
+            "Patent Search Agent": self._patent_search_results,
+            "Pattern Recognition Agent": self._pattern_recognition_results,
+            "Biomarker Discovery Agent": self._biomarker_discovery_results,
+            "Literature Analysis Agent": self._literature_analysis_results,
+            "Data Mining Agent": self._data_mining_results,
+            "Image Analysis Agent": self._image_analysis_results,
+            "Report Generation Agent": self._report_generation_results,
+            "Risk Assessment Agent": self._risk_assessment_results,
+            "Treatment Optimization Agent": self._treatment_optimization_results
+        }
+        # Category defaults for agents without a dedicated generator
+        self._category_dispatch = {
+            "Workflow Automation": self._workflow_automation_results,
+            "Collaborative Research": self._collaborative_research_results,
+            "Real-Time Intelligence": self._intelligence_results,
+            "Advanced Analytics": self._analytics_results,
+            "Multi-Modal Research": self._multimodal_results,
+            "Decision Support": self._decision_support_results
+        }
+        logger.info("AI agents initialized with comprehensive ADK system")
         
-    def get_available_agents(self) -> Dict[str, List[str]]:
+    def get_available_agents(self) -> Mapping[str, Tuple[str, ...]]:
         """Get available agent categories and their agents"""
-        return {
-            "Workflow Automation": [
-                "Drug Pipeline Agent",
-                "Data Collection Agent", 
-                "Quality Control Agent",
-                "Knowledge Update Agent"
-            ],
-            "Collaborative Research": [
-                "Collaboration Setup Agent",
-                "Market Analysis Agent",
-                "Patent Search Agent",
-                "Regulatory Compliance Agent"
-            ],
-            "Real-Time Intelligence": [
-                "Pattern Recognition Agent",
-                "Biomarker Discovery Agent",
-                "Safety Monitoring Agent",
-                "Clinical Insights Agent"
-            ],
-            "Advanced Analytics": [
-                "Document Processing Agent",
-                "Literature Analysis Agent",
-                "Data Mining Agent",
-                "Predictive Analytics Agent"
-            ],
-            "Multi-Modal Research": [
-                "Image Analysis Agent",
-                "Text Processing Agent",
-                "Molecular Visualization Agent",
-                "Report Generation Agent"
-            ],
-            "Decision Support": [
-                "Risk Assessment Agent",
-                "Treatment Optimization Agent",
-                "Drug Repurposing Agent",
-                "Clinical Decision Agent"
-            ]
-        }
-    
-    def execute_agent_workflow(self, category: str, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute an agent workflow"""
+        return _AVAILABLE_AGENTS
+    
+    def get_agent_categories(self) -> Tuple[str, ...]:
+        """Get sorted agent category names"""
+        return _AGENT_CATEGORIES
+    
+    def get_agents_by_category(self, category: str) -> Tuple[str, ...]:
+        """Get agent names belonging to a category"""
+        return _AVAILABLE_AGENTS.get(category, ())
+    
+    def get_agent_category(self, agent_name: str) -> Optional[str]:
+        """Look up the category an agent belongs to"""
+        return _AGENT_CATEGORY.get(agent_name)
+    
+    def execute_agent_workflow(self, category: str, agent_name: str, input_data: Dict[str, Any],
+                               deterministic: bool = False) -> Dict[str, Any]:
+        """Execute an agent workflow
+        
+        With deterministic=True, repeated calls with the same category, agent and
+        input reuse the first generated results instead of drawing new ones.
+        """
         try:
-            workflow_id = f"WF_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            stamp, timestamp = _time_cache.now()
+            workflow_id = f"WF_{stamp}_{next(_workflow_counter)}"
             
             # Simulate agent execution
             result = {
@@ -68,159 +217,260 @@ class AgentManager:
                 "category": category,
                 "agent": agent_name,
                 "status": "completed",
-                "execution_time": datetime.now().isoformat(),
-                "results": self._generate_agent_results(category, agent_name, input_data)
+                "execution_time": timestamp,
+                "results": (self._cached_agent_results(category, agent_name, input_data)
+                            if deterministic else
+                            self._generate_agent_results(category, agent_name, input_data))
             }
             
-            self.logger.info(f"Agent workflow completed: {agent_name}")
+            logger.info(f"Agent workflow completed: {agent_name}")
             return result
             
         except Exception as e:
-            self.logger.error(f"Agent workflow failed: {e}")
+            logger.error(f"Agent workflow failed: {e}")
             return {"error": str(e)}
     
+    def execute_scatter_gather(self, category: str, agent_names: Iterable[str], input_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Run several agents of a category on the same input concurrently and collect results by agent name
+        
+        Agents still running after timeout_seconds, counted from the start of
+        the call, are reported as timed out.
+        """
+        pool = self._get_pool()
+        futures = {
+            pool.submit(self.execute_agent_workflow, category, agent_name, input_data): agent_name
+            for agent_name in agent_names
+        }
+        
+        results = {}
+        try:
+            for future in as_completed(futures, timeout=self.timeout_seconds):
+                agent_name = futures[future]
+                try:
+                    results[agent_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Agent workflow failed: {agent_name}: {e}")
+                    results[agent_name] = {"error": str(e)}
+        except FutureTimeoutError:
+            for future, agent_name in futures.items():
+                if agent_name not in results:
+                    future.cancel()
+                    results[agent_name] = {"error": f"Timed out after {self.timeout_seconds}s"}
+        
+        return results
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get the scatter/gather worker pool, starting it on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_parallel_agents,
+                                                thread_name_prefix="agent-workflow")
+                atexit.register(self.shutdown)
+            return self._pool
+    
+    def shutdown(self):
+        """Stop the scatter/gather worker pool, cancelling workflows that have not started"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            atexit.unregister(self.shutdown)
+    
+    async def execute_agent_workflow_async(self, category: str, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an agent workflow without blocking the event loop"""
+        return await asyncio.to_thread(self.execute_agent_workflow, category, agent_name, input_data)
+    
+    async def execute_agents_parallel(self, requests: Iterable[Tuple[str, str, Dict[str, Any]]],
+                                      max_parallel: int = MAX_PARALLEL_AGENTS) -> List[Dict[str, Any]]:
+        """Execute independent (category, agent_name, input_data) workflows concurrently"""
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def run(category: str, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_agent_workflow_async(category, agent_name, input_data)
+        
+        results = await asyncio.gather(
+            *(run(category, agent_name, input_data) for category, agent_name, input_data in requests),
+            return_exceptions=True
+        )
+        return [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
+    
+    def _cached_agent_results(self, category: str, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return memoized results for (category, agent_name, input_data), generating them on first use"""
+        key = (category, agent_name, _freeze_input(input_data))
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        results = self._generate_agent_results(category, agent_name, input_data)
+        with self._result_cache_lock:
+            if len(self._result_cache) >= RESULT_CACHE_SIZE:
+                self._result_cache.pop(next(iter(self._result_cache)))
+            results = self._result_cache.setdefault(key, results)
+        return dict(results)
+    
     def _generate_agent_results(self, category: str, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate realistic agent results based on category and input"""
-        
-        if category == "Workflow Automation":
-            return self._workflow_automation_results(agent_name, input_data)
-        elif category == "Collaborative Research":
-            return self._collaborative_research_results(agent_name, input_data)
-        elif category == "Real-Time Intelligence":
-            return self._intelligence_results(agent_name, input_data)
-        elif category == "Advanced Analytics":
-            return self._analytics_results(agent_name, input_data)
-        elif category == "Multi-Modal Research":
-            return self._multimodal_results(agent_name, input_data)
-        elif category == "Decision Support":
-            return self._decision_support_results(agent_name, input_data)
-        else:
-            return {"message": f"Results from {agent_name}"}
+        handler = self._result_generators.get(agent_name)
+        if handler is None:
+            handler = self._category_dispatch.get(category)
+            if handler is None:
+                return {"message": f"Results from {agent_name}"}
+        return handler(agent_name, input_data)
+    
+    # Workflow Automation
+    
+    def _drug_pipeline_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate drug pipeline results"""
+        compounds, targets, success = self._rng.uniform((50, 10, 75), (201, 51, 95))
+        return {
+            "pipeline_status": "Active",
+            "compounds_processed": int(compounds),
+            "targets_analyzed": int(targets),
+            "success_rate": f"{success:.1f}%",
+            "estimated_completion": "2-3 weeks"
+        }
+    
+    def _data_collection_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate data collection results"""
+        records, quality = self._rng.uniform((1000, 85), (5001, 98))
+        return {
+            "sources_accessed": ["PubMed", "ChEMBL", "DrugBank", "ZINC"],
+            "records_collected": int(records),
+            "data_quality_score": f"{quality:.1f}%"
+        }
+    
+    def _quality_control_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate quality control results"""
+        return {
+            "validation_status": "Passed",
+            "error_rate": f"{_uniform(0.1, 2.0):.2f}%",
+            "recommendations": ["Increase sample size", "Validate against control group"]
+        }
     
     def _workflow_automation_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate workflow automation results"""
-        import random
-        
-        if "Pipeline" in agent_name:
-            return {
-                "pipeline_status": "Active",
-                "compounds_processed": random.randint(50, 200),
-                "targets_analyzed": random.randint(10, 50),
-                "success_rate": f"{random.uniform(75, 95):.1f}%",
-                "estimated_completion": "2-3 weeks"
-            }
-        elif "Data Collection" in agent_name:
-            return {
-                "sources_accessed": ["PubMed", "ChEMBL", "DrugBank", "ZINC"],
-                "records_collected": random.randint(1000, 5000),
-                "data_quality_score": f"{random.uniform(85, 98):.1f}%"
-            }
-        elif "Quality Control" in agent_name:
-            return {
-                "validation_status": "Passed",
-                "error_rate": f"{random.uniform(0.1, 2.0):.2f}%",
-                "recommendations": ["Increase sample size", "Validate against control group"]
-            }
-        else:
-            return {"status": "Knowledge base updated successfully"}
+        """Generate default workflow automation results"""
+        return {"status": "Knowledge base updated successfully"}
+    
+    # Collaborative Research
+    
+    def _market_analysis_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate market analysis results"""
+        market_size, growth_rate = self._rng.uniform((5, 8), (50, 15))
+        return {
+            "market_size": f"${market_size:.1f}B",
+            "growth_rate": f"{growth_rate:.1f}% CAGR",
+            "key_players": ["Pfizer", "Roche", "Novartis", "AstraZeneca"],
+            "opportunities": ["Rare diseases", "Personalized medicine"]
+        }
+    
+    def _patent_search_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate patent search results"""
+        patents, conflicts = self._rng.integers((20, 0), (101, 4))
+        return {
+            "patents_found": int(patents),
+            "freedom_to_operate": "Clear",
+            "potential_conflicts": int(conflicts),
+            "filing_recommendations": ["File continuation patent", "Consider international filing"]
+        }
     
     def _collaborative_research_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate collaborative research results"""
-        import random
-        
-        if "Market Analysis" in agent_name:
-            return {
-                "market_size": f"${random.uniform(5, 50):.1f}B",
-                "growth_rate": f"{random.uniform(8, 15):.1f}% CAGR",
-                "key_players": ["Pfizer", "Roche", "Novartis", "AstraZeneca"],
-                "opportunities": ["Rare diseases", "Personalized medicine"]
-            }
-        elif "Patent Search" in agent_name:
-            return {
-                "patents_found": random.randint(20, 100),
-                "freedom_to_operate": "Clear",
-                "potential_conflicts": random.randint(0, 3),
-                "filing_recommendations": ["File continuation patent", "Consider international filing"]
-            }
-        else:
-            return {"collaboration_status": "Established", "team_size": random.randint(5, 15)}
+        """Generate default collaborative research results"""
+        return {"collaboration_status": "Established", "team_size": _randint(5, 15)}
+    
+    # Real-Time Intelligence
+    
+    def _pattern_recognition_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate pattern recognition results"""
+        patterns, confidence = self._rng.uniform((5, 80), (21, 95))
+        return {
+            "patterns_identified": int(patterns),
+            "confidence_score": f"{confidence:.1f}%",
+            "novel_insights": ["Structure-activity relationship discovered", "New target interaction identified"]
+        }
+    
+    def _biomarker_discovery_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate biomarker discovery results"""
+        return {
+            "biomarkers_identified": _randint(3, 10),
+            "validation_status": "In Progress",
+            "clinical_relevance": "High"
+        }
     
     def _intelligence_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate intelligence results"""
-        import random
-        
-        if "Pattern Recognition" in agent_name:
-            return {
-                "patterns_identified": random.randint(5, 20),
-                "confidence_score": f"{random.uniform(80, 95):.1f}%",
-                "novel_insights": ["Structure-activity relationship discovered", "New target interaction identified"]
-            }
-        elif "Biomarker Discovery" in agent_name:
-            return {
-                "biomarkers_identified": random.randint(3, 10),
-                "validation_status": "In Progress",
-                "clinical_relevance": "High"
-            }
-        else:
-            return {"monitoring_status": "Active", "alerts_generated": random.randint(0, 5)}
+        """Generate default intelligence results"""
+        return {"monitoring_status": "Active", "alerts_generated": _randint(0, 5)}
+    
+    # Advanced Analytics
+    
+    def _literature_analysis_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate literature analysis results"""
+        return {
+            "papers_analyzed": _randint(100, 500),
+            "key_findings": ["Novel mechanism identified", "Safety profile confirmed"],
+            "research_gaps": ["Limited clinical data", "Need for biomarker validation"]
+        }
+    
+    def _data_mining_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate data mining results"""
+        datasets, correlations, accuracy = self._rng.uniform((10, 5, 75), (51, 26, 90))
+        return {
+            "datasets_processed": int(datasets),
+            "correlations_found": int(correlations),
+            "predictive_accuracy": f"{accuracy:.1f}%"
+        }
     
     def _analytics_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate analytics results"""
-        import random
-        
-        if "Literature Analysis" in agent_name:
-            return {
-                "papers_analyzed": random.randint(100, 500),
-                "key_findings": ["Novel mechanism identified", "Safety profile confirmed"],
-                "research_gaps": ["Limited clinical data", "Need for biomarker validation"]
-            }
-        elif "Data Mining" in agent_name:
-            return {
-                "datasets_processed": random.randint(10, 50),
-                "correlations_found": random.randint(5, 25),
-                "predictive_accuracy": f"{random.uniform(75, 90):.1f}%"
-            }
-        else:
-            return {"analysis_complete": True, "insights_generated": random.randint(5, 15)}
+        """Generate default analytics results"""
+        return {"analysis_complete": True, "insights_generated": _randint(5, 15)}
+    
+    # Multi-Modal Research
+    
+    def _image_analysis_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate image analysis results"""
+        images, features, accuracy = self._rng.uniform((50, 100, 85), (201, 501, 95))
+        return {
+            "images_processed": int(images),
+            "features_extracted": int(features),
+            "classification_accuracy": f"{accuracy:.1f}%"
+        }
+    
+    def _report_generation_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate report generation results"""
+        return {
+            "report_status": "Generated",
+            "pages": _randint(15, 50),
+            "sections": ["Executive Summary", "Methods", "Results", "Conclusions"]
+        }
     
     def _multimodal_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate multi-modal results"""
-        import random
-        
-        if "Image Analysis" in agent_name:
-            return {
-                "images_processed": random.randint(50, 200),
-                "features_extracted": random.randint(100, 500),
-                "classification_accuracy": f"{random.uniform(85, 95):.1f}%"
-            }
-        elif "Report Generation" in agent_name:
-            return {
-                "report_status": "Generated",
-                "pages": random.randint(15, 50),
-                "sections": ["Executive Summary", "Methods", "Results", "Conclusions"]
-            }
-        else:
-            return {"processing_complete": True, "output_format": "Multi-modal report"}
+        """Generate default multi-modal results"""
+        return {"processing_complete": True, "output_format": "Multi-modal report"}
+    
+    # Decision Support
+    
+    def _risk_assessment_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate risk assessment results"""
+        return {
+            "risk_level": _choice(("Low", "Medium", "High")),
+            "risk_factors": ["Hepatotoxicity", "Drug interactions", "Allergic reactions"],
+            "mitigation_strategies": ["Dose adjustment", "Patient monitoring", "Contraindication guidelines"]
+        }
+    
+    def _treatment_optimization_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate treatment optimization results"""
+        dosage, route, duration = self._rng.uniform((10, 0, 7), (500, 3, 91))
+        return {
+            "optimal_dosage": f"{dosage:.0f} mg",
+            "administration_route": ("Oral", "Intravenous", "Subcutaneous")[int(route)],
+            "treatment_duration": f"{int(duration)} days"
+        }
     
     def _decision_support_results(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate decision support results"""
-        import random
-        
-        if "Risk Assessment" in agent_name:
-            return {
-                "risk_level": random.choice(["Low", "Medium", "High"]),
-                "risk_factors": ["Hepatotoxicity", "Drug interactions", "Allergic reactions"],
-                "mitigation_strategies": ["Dose adjustment", "Patient monitoring", "Contraindication guidelines"]
-            }
-        elif "Treatment Optimization" in agent_name:
-            return {
-                "optimal_dosage": f"{random.uniform(10, 500):.0f} mg",
-                "administration_route": random.choice(["Oral", "Intravenous", "Subcutaneous"]),
-                "treatment_duration": f"{random.randint(7, 90)} days"
-            }
-        else:
-            return {"recommendation": "Proceed with clinical trials", "confidence": f"{random.uniform(80, 95):.1f}%"}
+        """Generate default decision support results"""
+        return {"recommendation": "Proceed with clinical trials", "confidence": f"{_uniform(80, 95):.1f}%"}
     
-    def get_agent_status(self) -> Dict[str, str]:
+    def get_agent_status(self) -> Mapping[str, str]:
         """Get status of all agents"""
-        return {"system_status": "Active", "total_agents": "24", "availability": "100%"}
\ No newline at end of file
+        return _AGENT_STATUS
\ No newline at end of file
@@ -1,11 +1,11 @@
 import streamlit as st
-import os
-import sys
+import time
 import traceback
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# `streamlit run app.py` already puts this directory first on sys.path,
+# so the project packages below import without any path manipulation
 
 from models.model_manager import ModelManager
 from models.prediction_tasks import PredictionTasks
@@ -14,6 +14,47 @@ from utils.validation import ValidationUtils
 from utils.model_preloader import ModelPreloader
 from config.model_registry import MODEL_REGISTRY
 
+# Model names per task, materialized once since MODEL_REGISTRY is static
+TASK_MODEL_OPTIONS = {task: tuple(models.keys()) for task, models in MODEL_REGISTRY.items()}
+
+# Widget option lists, built once at import rather than on every rerun
+TASKS = ('DTI', 'DTA', 'DDI', 'ADMET', 'Similarity')
+AFFINITY_TYPES = ("IC50", "Kd", "Ki")
+INTERACTION_TYPES = ("Synergistic", "Antagonistic", "Additive", "Unknown")
+ADMET_PROPERTIES = ("Absorption", "Distribution", "Metabolism", "Excretion", "Toxicity", "LD50", "logP", "Solubility")
+SIMILARITY_METHODS = ("Tanimoto", "Dice", "Cosine", "Euclidean")
+
+# Sample data for different tasks
+SAMPLE_DATA = {
+    'DTI': {
+        'drug_smiles': 'CC(=O)OC1=CC=CC=C1C(=O)O',  # Aspirin
+        'target_sequence': 'MGSWAEFKQRLAAIGLLMLLKHLLLSLKKFGKLQFSLPSLLQLFCRQRLLPSLLPWLSSSLKVMLLKHL'
+    },
+    'DTA': {
+        'drug_smiles': 'CN1C=NC2=C1C(=O)N(C(=O)N2C)C',  # Caffeine
+        'target_sequence': 'MVLSPADKTNVKAAWGKVGAHAGEYGAEALERMFLSFPTTKTYFPHFDLSHGSAQVKGHGKKVADALTNAVAHVDDMPNALSALSDLHAHKLRVDPVNFKLLSHCLLVTLAAHLPAEFTPAVHASLDKFLASVSTVLTSKYR'
+    },
+    'DDI': {
+        'drug1_smiles': 'CC(C)CC1=CC=C(C=C1)C(C)C(=O)O',  # Ibuprofen
+        'drug2_smiles': 'CC(=O)OC1=CC=CC=C1C(=O)O'  # Aspirin
+    },
+    'ADMET': {
+        'drug_smiles': 'CN1CCN(CC1)CCCC(C2=CC=CC=C2)C3=CC=CC=C3',  # Cetirizine-like
+    },
+    'Similarity': {
+        'query_smiles': 'CCO'  # Ethanol
+    }
+}
+
+# Sidebar preview of each sample: (caption, value truncated to 50 characters)
+SAMPLE_DATA_DISPLAY = {
+    task: tuple(
+        (f"**{key.replace('_', ' ').title()}:**", value[:50] + "..." if len(value) > 50 else value)
+        for key, value in samples.items()
+    )
+    for task, samples in SAMPLE_DATA.items()
+}
+
 # Page configuration
 st.set_page_config(
     page_title="PharmQAgentAI",
@@ -22,26 +63,61 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Shared components: one instance per server process, reused by every session
+@st.cache_resource
+def get_model_manager():
+    """Get the process-wide model manager"""
+    return ModelManager()
+
+@st.cache_resource
+def get_prediction_tasks():
+    """Get the process-wide prediction task runner"""
+    return PredictionTasks(get_model_manager())
+
+@st.cache_resource
+def get_inference_pool():
+    """Get the process-wide single-worker executor that serializes model inference"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+def run_prediction(predict_fn, *args):
+    """Run a prediction on the shared inference worker and wait for its result"""
+    return get_inference_pool().submit(predict_fn, *args).result()
+
+@st.cache_resource
+def get_molecular_utils():
+    """Get the process-wide molecular utilities"""
+    return MolecularUtils()
+
+@st.cache_resource
+def get_validation_utils():
+    """Get the process-wide validation utilities"""
+    return ValidationUtils()
+
+@st.cache_resource
+def get_model_preloader():
+    """Get the process-wide model preloader"""
+    return ModelPreloader(get_model_manager())
+
 # Initialize session state
-if 'model_manager' not in st.session_state:
-    st.session_state.model_manager = ModelManager()
-if 'prediction_tasks' not in st.session_state:
-    st.session_state.prediction_tasks = PredictionTasks(st.session_state.model_manager)
-if 'molecular_utils' not in st.session_state:
-    st.session_state.molecular_utils = MolecularUtils()
-if 'validation_utils' not in st.session_state:
-    st.session_state.validation_utils = ValidationUtils()
-if 'model_preloader' not in st.session_state:
-    st.session_state.model_preloader = ModelPreloader(st.session_state.model_manager)
 if 'current_task' not in st.session_state:
     st.session_state.current_task = 'DTI'
 if 'loaded_models' not in st.session_state:
+    # Keyed by (task, model_name)
     st.session_state.loaded_models = {}
+if 'model_owner_id' not in st.session_state:
+    # Identifies this session's hold on models in the shared model manager
+    st.session_state.model_owner_id = uuid.uuid4().hex
 if 'prediction_results' not in st.session_state:
     st.session_state.prediction_results = {}
 if 'preload_initiated' not in st.session_state:
     st.session_state.preload_initiated = False
 
+def sync_loaded_models():
+    """Drop session entries for models the shared model manager has evicted"""
+    resident = {(info['task'], info['name']) for info in get_model_manager().get_loaded_models().values()}
+    for model_key in [key for key in st.session_state.loaded_models if key not in resident]:
+        del st.session_state.loaded_models[model_key]
+
 def render_top_bar():
     """Render the top navigation bar"""
     col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
@@ -64,22 +140,28 @@ def render_top_bar():
         model_count = len(st.session_state.loaded_models)
         st.metric("Loaded Models", f"{model_count}/5")
 
+def unload_model(model_key, task, model_name):
+    """Button callback: release this session's model before the next run renders the sidebar
+    
+    The model stays loaded while other sessions still hold it.
+    """
+    get_model_manager().release_model(task, model_name, st.session_state.model_owner_id)
+    st.session_state.loaded_models.pop(model_key, None)
+
 def render_sidebar():
     """Render the sidebar with task selection and model management"""
     st.sidebar.header("Therapeutic Tasks")
     
     # Task selection
-    tasks = ['DTI', 'DTA', 'DDI', 'ADMET', 'Similarity']
     current_task = st.sidebar.selectbox(
         "Select Task",
-        tasks,
-        index=tasks.index(st.session_state.current_task),
+        TASKS,
+        index=TASKS.index(st.session_state.current_task),
         key="task_selector"
     )
     
-    if current_task != st.session_state.current_task:
-        st.session_state.current_task = current_task
-        st.rerun()
+    # The selectbox change already triggered this run; the main area renders after the sidebar
+    st.session_state.current_task = current_task
     
     st.sidebar.divider()
     
@@ -87,27 +169,28 @@ def render_sidebar():
     st.sidebar.subheader("🚀 Transformer DTI Models")
     
     # Preload status display
-    preload_status = st.session_state.model_preloader.get_preload_status()
-    preloaded_models = st.session_state.model_preloader.get_preloaded_models()
+    preload_status = get_model_preloader().get_preload_status()
+    preloaded_models = get_model_preloader().get_preloaded_models()
     
     if preloaded_models:
         st.sidebar.success(f"✓ {len(preloaded_models)} models loaded")
         with st.sidebar.expander("Loaded Models"):
-            for model in preloaded_models:
-                st.write(f"• {model}")
+            st.markdown("\n".join(f"- {model}" for model in preloaded_models))
     
     # Preload all transformer DTI models button
     if st.sidebar.button("Load All Transformer Models", key="preload_all_models", type="primary"):
         with st.spinner("Loading all transformer DTI models..."):
-            preload_results = st.session_state.model_preloader.preload_transformer_dti_models()
+            preload_results = get_model_preloader().preload_transformer_dti_models()
             
             # Update session state with loaded models
+            loaded_at_str = time.strftime('%H:%M:%S')
             for model_name in preload_results['success_models']:
-                model_key = f"DTI_{model_name}"
+                model_key = ('DTI', model_name)
+                get_model_manager().load_model('DTI', model_name, owner=st.session_state.model_owner_id)
                 st.session_state.loaded_models[model_key] = {
                     'task': 'DTI',
                     'name': model_name,
-                    'loaded_at': datetime.now()
+                    'loaded_at_str': loaded_at_str
                 }
             
             if preload_results['loaded_successfully'] > 0:
@@ -115,8 +198,6 @@ def render_sidebar():
             
             if preload_results['failed_models']:
                 st.sidebar.warning(f"{len(preload_results['failed_models'])} models failed to load")
-                
-            st.rerun()
     
     st.sidebar.divider()
     
@@ -124,8 +205,8 @@ def render_sidebar():
     st.sidebar.subheader(f"{current_task} Models")
     
     available_models = MODEL_REGISTRY.get(current_task, {})
-    if available_models:
-        model_options = list(available_models.keys())
+    model_options = TASK_MODEL_OPTIONS.get(current_task, ())
+    if model_options:
         selected_model = st.sidebar.selectbox(
             "Choose Model",
             model_options,
@@ -142,29 +223,31 @@ def render_sidebar():
             )
         with col2:
             # Model status indicator
-            model_key = f"{current_task}_{selected_model}"
+            model_key = (current_task, selected_model)
+            model_status = st.empty()
             if model_key in st.session_state.loaded_models:
-                st.success("✓")
+                model_status.success("✓")
             else:
-                st.error("✗")
+                model_status.error("✗")
         
         if load_button:
             try:
                 with st.spinner(f"Loading {selected_model}..."):
-                    success = st.session_state.model_manager.load_model(
+                    success = get_model_manager().load_model(
                         current_task, 
                         selected_model, 
-                        available_models[selected_model]
+                        available_models[selected_model],
+                        owner=st.session_state.model_owner_id
                     )
                     
                 if success:
                     st.session_state.loaded_models[model_key] = {
                         'task': current_task,
                         'name': selected_model,
-                        'loaded_at': datetime.now()
+                        'loaded_at_str': time.strftime('%H:%M:%S')
                     }
+                    model_status.success("✓")
                     st.sidebar.success(f"{selected_model} loaded successfully!")
-                    st.rerun()
                 else:
                     st.sidebar.error(f"Failed to load {selected_model}. The transformers library is required for model loading.")
                     st.sidebar.info("To enable model loading, please install the transformers package.")
@@ -181,45 +264,21 @@ def render_sidebar():
     # Sample Data section
     st.sidebar.subheader("📋 Sample Data")
     
-    # Sample data for different tasks
-    sample_data = {
-        'DTI': {
-            'drug_smiles': 'CC(=O)OC1=CC=CC=C1C(=O)O',  # Aspirin
-            'target_sequence': 'MGSWAEFKQRLAAIGLLMLLKHLLLSLKKFGKLQFSLPSLLQLFCRQRLLPSLLPWLSSSLKVMLLKHL'
-        },
-        'DTA': {
-            'drug_smiles': 'CN1C=NC2=C1C(=O)N(C(=O)N2C)C',  # Caffeine
-            'target_sequence': 'MVLSPADKTNVKAAWGKVGAHAGEYGAEALERMFLSFPTTKTYFPHFDLSHGSAQVKGHGKKVADALTNAVAHVDDMPNALSALSDLHAHKLRVDPVNFKLLSHCLLVTLAAHLPAEFTPAVHASLDKFLASVSTVLTSKYR'
-        },
-        'DDI': {
-            'drug1_smiles': 'CC(C)CC1=CC=C(C=C1)C(C)C(=O)O',  # Ibuprofen
-            'drug2_smiles': 'CC(=O)OC1=CC=CC=C1C(=O)O'  # Aspirin
-        },
-        'ADMET': {
-            'drug_smiles': 'CN1CCN(CC1)CCCC(C2=CC=CC=C2)C3=CC=CC=C3',  # Cetirizine-like
-        },
-        'Similarity': {
-            'query_smiles': 'CCO'  # Ethanol
-        }
-    }
-    
     if st.sidebar.button("🎯 Use Sample Data", use_container_width=True):
-        current_samples = sample_data.get(st.session_state.current_task, {})
+        current_samples = SAMPLE_DATA.get(st.session_state.current_task, {})
         
         # Store sample data in session state for the current task
         for key, value in current_samples.items():
             st.session_state[f"sample_{key}"] = value
         
         st.sidebar.success(f"Sample data loaded for {st.session_state.current_task}!")
-        st.rerun()
     
     # Display current sample data
-    if st.session_state.current_task in sample_data:
+    if st.session_state.current_task in SAMPLE_DATA:
         with st.sidebar.expander("View Sample Data"):
-            samples = sample_data[st.session_state.current_task]
-            for key, value in samples.items():
-                st.caption(f"**{key.replace('_', ' ').title()}:**")
-                st.code(value[:50] + "..." if len(value) > 50 else value, language="text")
+            for label, preview in SAMPLE_DATA_DISPLAY[st.session_state.current_task]:
+                st.caption(label)
+                st.code(preview, language="text")
     
     st.sidebar.divider()
     
@@ -230,13 +289,13 @@ def render_sidebar():
     smart_mode = st.sidebar.toggle("Smart Mode", value=True, disabled=True)
     st.sidebar.caption("Automatically selects best model (Coming Soon)")
     
-    # Reset all models
+    # Reset this session's models; models other sessions hold stay loaded
     if st.sidebar.button("Reset All Models", type="secondary", use_container_width=True):
-        st.session_state.model_manager.unload_all_models()
+        for task, model_name in st.session_state.loaded_models:
+            get_model_manager().release_model(task, model_name, st.session_state.model_owner_id)
         st.session_state.loaded_models.clear()
         st.session_state.prediction_results.clear()
         st.sidebar.success("All models unloaded!")
-        st.rerun()
     
     # Display loaded models info
     if st.session_state.loaded_models:
@@ -244,11 +303,13 @@ def render_sidebar():
         for model_key, model_info in st.session_state.loaded_models.items():
             with st.sidebar.expander(f"{model_info['task']}: {model_info['name']}"):
                 st.write(f"**Task:** {model_info['task']}")
-                st.write(f"**Loaded:** {model_info['loaded_at'].strftime('%H:%M:%S')}")
-                if st.button(f"Unload", key=f"unload_{model_key}"):
-                    st.session_state.model_manager.unload_model(model_info['task'], model_info['name'])
-                    del st.session_state.loaded_models[model_key]
-                    st.rerun()
+                st.write(f"**Loaded:** {model_info['loaded_at_str']}")
+                st.button(
+                    "Unload",
+                    key=f"unload_{model_info['task']}_{model_info['name']}",
+                    on_click=unload_model,
+                    args=(model_key, model_info['task'], model_info['name'])
+                )
 
 def render_dti_interface():
     """Render DTI prediction interface"""
@@ -294,26 +355,26 @@ def render_dti_interface():
             return
         
         # Check if model is loaded
-        model_key = f"DTI_{st.session_state.get('model_selector_DTI', '')}"
+        model_key = ('DTI', st.session_state.get('model_selector_DTI', ''))
         if model_key not in st.session_state.loaded_models:
             st.error("Please load a DTI model first")
             return
         
         # Validate SMILES
-        if not st.session_state.validation_utils.validate_smiles(drug_smiles):
+        if not get_validation_utils().validate_smiles(drug_smiles):
             st.error("Invalid SMILES string provided")
             return
         
         # Validate protein sequence
-        if not st.session_state.validation_utils.validate_protein_sequence(target_sequence):
+        if not get_validation_utils().validate_protein_sequence(target_sequence):
             st.error("Invalid protein sequence provided")
             return
         
         # Make prediction
         with st.spinner("Making DTI prediction..."):
             try:
-                result = st.session_state.prediction_tasks.predict_dti(
-                    drug_smiles, target_sequence
+                result = run_prediction(
+                    get_prediction_tasks().predict_dti, drug_smiles, target_sequence
                 )
                 
                 if result:
@@ -342,7 +403,7 @@ def render_dta_interface():
         
         affinity_type = st.selectbox(
             "Affinity Type",
-            ["IC50", "Kd", "Ki"],
+            AFFINITY_TYPES,
             help="Type of binding affinity to predict"
         )
     
@@ -361,23 +422,23 @@ def render_dta_interface():
             st.error("Please provide both drug SMILES and target sequence")
             return
         
-        model_key = f"DTA_{st.session_state.get('model_selector_DTA', '')}"
+        model_key = ('DTA', st.session_state.get('model_selector_DTA', ''))
         if model_key not in st.session_state.loaded_models:
             st.error("Please load a DTA model first")
             return
         
-        if not st.session_state.validation_utils.validate_smiles(drug_smiles):
+        if not get_validation_utils().validate_smiles(drug_smiles):
             st.error("Invalid SMILES string provided")
             return
         
-        if not st.session_state.validation_utils.validate_protein_sequence(target_sequence):
+        if not get_validation_utils().validate_protein_sequence(target_sequence):
             st.error("Invalid protein sequence provided")
             return
         
         with st.spinner("Predicting binding affinity..."):
             try:
-                result = st.session_state.prediction_tasks.predict_dta(
-                    drug_smiles, target_sequence, affinity_type
+                result = run_prediction(
+                    get_prediction_tasks().predict_dta, drug_smiles, target_sequence, affinity_type
                 )
                 
                 if result:
@@ -413,7 +474,7 @@ def render_ddi_interface():
     
     interaction_type = st.selectbox(
         "Interaction Type",
-        ["Synergistic", "Antagonistic", "Additive", "Unknown"],
+        INTERACTION_TYPES,
         help="Type of interaction to analyze"
     )
     
@@ -424,23 +485,23 @@ def render_ddi_interface():
             st.error("Please provide SMILES for both drugs")
             return
         
-        model_key = f"DDI_{st.session_state.get('model_selector_DDI', '')}"
+        model_key = ('DDI', st.session_state.get('model_selector_DDI', ''))
         if model_key not in st.session_state.loaded_models:
             st.error("Please load a DDI model first")
             return
         
-        if not st.session_state.validation_utils.validate_smiles(drug1_smiles):
+        if not get_validation_utils().validate_smiles(drug1_smiles):
             st.error("Invalid SMILES string for Drug 1")
             return
         
-        if not st.session_state.validation_utils.validate_smiles(drug2_smiles):
+        if not get_validation_utils().validate_smiles(drug2_smiles):
             st.error("Invalid SMILES string for Drug 2")
             return
         
         with st.spinner("Predicting drug interaction..."):
             try:
-                result = st.session_state.prediction_tasks.predict_ddi(
-                    drug1_smiles, drug2_smiles, interaction_type
+                result = run_prediction(
+                    get_prediction_tasks().predict_ddi, drug1_smiles, drug2_smiles, interaction_type
                 )
                 
                 if result:
@@ -469,7 +530,7 @@ def render_admet_interface():
     with col2:
         admet_properties = st.multiselect(
             "ADMET Properties",
-            ["Absorption", "Distribution", "Metabolism", "Excretion", "Toxicity", "LD50", "logP", "Solubility"],
+            ADMET_PROPERTIES,
             default=["Absorption", "Toxicity"],
             help="Select properties to predict"
         )
@@ -485,19 +546,19 @@ def render_admet_interface():
             st.error("Please select at least one ADMET property")
             return
         
-        model_key = f"ADMET_{st.session_state.get('model_selector_ADMET', '')}"
+        model_key = ('ADMET', st.session_state.get('model_selector_ADMET', ''))
         if model_key not in st.session_state.loaded_models:
             st.error("Please load an ADMET model first")
             return
         
-        if not st.session_state.validation_utils.validate_smiles(drug_smiles):
+        if not get_validation_utils().validate_smiles(drug_smiles):
             st.error("Invalid SMILES string provided")
             return
         
         with st.spinner("Predicting ADMET properties..."):
             try:
-                result = st.session_state.prediction_tasks.predict_admet(
-                    drug_smiles, admet_properties
+                result = run_prediction(
+                    get_prediction_tasks().predict_admet, drug_smiles, admet_properties
                 )
                 
                 if result:
@@ -535,7 +596,7 @@ def render_similarity_interface():
     with col2:
         similarity_method = st.selectbox(
             "Similarity Method",
-            ["Tanimoto", "Dice", "Cosine", "Euclidean"],
+            SIMILARITY_METHODS,
             help="Method for calculating molecular similarity"
         )
         
@@ -554,19 +615,19 @@ def render_similarity_interface():
             st.error("Please provide query SMILES")
             return
         
-        model_key = f"Similarity_{st.session_state.get('model_selector_Similarity', '')}"
+        model_key = ('Similarity', st.session_state.get('model_selector_Similarity', ''))
         if model_key not in st.session_state.loaded_models:
             st.error("Please load a Similarity model first")
             return
         
-        if not st.session_state.validation_utils.validate_smiles(query_smiles):
+        if not get_validation_utils().validate_smiles(query_smiles):
             st.error("Invalid SMILES string provided")
             return
         
         with st.spinner("Searching for similar compounds..."):
             try:
-                result = st.session_state.prediction_tasks.predict_similarity(
-                    query_smiles, similarity_threshold, similarity_method, max_results
+                result = run_prediction(
+                    get_prediction_tasks().predict_similarity, query_smiles, similarity_threshold, similarity_method, max_results
                 )
                 
                 if result:
@@ -611,15 +672,15 @@ def render_prediction_results():
             st.subheader("Detailed Results")
             
             if isinstance(result['details'], dict):
-                for key, value in result['details'].items():
-                    col1, col2 = st.columns([1, 2])
-                    with col1:
-                        st.write(f"**{key}:**")
-                    with col2:
-                        if isinstance(value, (int, float)):
-                            st.write(f"{value:.4f}")
-                        else:
-                            st.write(str(value))
+                # One table element instead of a column pair per detail
+                st.dataframe(
+                    [
+                        {"Property": key, "Value": f"{value:.4f}" if isinstance(value, (int, float)) else str(value)}
+                        for key, value in result['details'].items()
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
             else:
                 st.write(result['details'])
         
@@ -636,36 +697,49 @@ def render_prediction_results():
         if st.button("Clear Results", type="secondary"):
             if current_task in st.session_state.prediction_results:
                 del st.session_state.prediction_results[current_task]
-            st.rerun()
+            st.rerun(scope="fragment")
+
+# Task -> interface renderer; only the current task's widgets are created each run
+TASK_INTERFACES = {
+    'DTI': render_dti_interface,
+    'DTA': render_dta_interface,
+    'DDI': render_ddi_interface,
+    'ADMET': render_admet_interface,
+    'Similarity': render_similarity_interface
+}
+
+@st.fragment
+def render_task_workspace():
+    """Render the current task's interface and results
+    
+    Runs as a fragment so typing, sliders and predictions rerun only this
+    section instead of the sidebar and top bar as well.
+    """
+    render_interface = TASK_INTERFACES.get(st.session_state.current_task)
+    if render_interface:
+        render_interface()
+    
+    # Render prediction results if available
+    render_prediction_results()
 
 def main():
     """Main application function"""
     try:
-        # Render top bar
-        render_top_bar()
+        # Capacity and idle eviction happen inside the model manager
+        sync_loaded_models()
         
-        # Create layout
+        # Sidebar first so model and task changes made there show up in the top bar
+        # and main area within the same run (the layout itself is unaffected)
         render_sidebar()
         
+        # Render top bar
+        render_top_bar()
+        
         # Main content area
         st.divider()
         
-        # Render task-specific interface
-        current_task = st.session_state.current_task
-        
-        if current_task == 'DTI':
-            render_dti_interface()
-        elif current_task == 'DTA':
-            render_dta_interface()
-        elif current_task == 'DDI':
-            render_ddi_interface()
-        elif current_task == 'ADMET':
-            render_admet_interface()
-        elif current_task == 'Similarity':
-            render_similarity_interface()
-        
-        # Render prediction results if available
-        render_prediction_results()
+        # Render task-specific interface and its results
+        render_task_workspace()
         
         # Footer
         st.divider()
@@ -1,9 +1,7 @@
 import streamlit as st
-import os
-import sys
-
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import pandas as pd
+import time
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +11,42 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Transformer DTI models offered in the sidebar
+TRANSFORMER_MODELS = (
+    "SciBERT-DTI", "PubMedBERT-DTI", "ChemBERTa-DTI", "MolBERT-DTI",
+    "GPT2-DTI", "BERT-Base-DTI", "T5-Small-DTI", "ELECTRA-Small-DTI",
+    "ALBERT-Base-DTI", "DeBERTa-V3-Small", "XLNet-Base-DTI", "BART-Base-DTI",
+    "MPNet-Base-DTI", "Longformer-Base-DTI", "BigBird-Base-DTI",
+    "Reformer-DTI", "Pegasus-Small-DTI", "FNet-Base-DTI",
+    "Funnel-Transformer-DTI", "LED-Base-DTI"
+)
+_MODELS_MD = "\n".join(f"• {model}  " for model in TRANSFORMER_MODELS)
+
+# Simulated similarity candidates, kept as parallel arrays for vectorized filtering
+SIMILARITY_NAMES = np.array(["Compound A", "Compound B", "Compound C"])
+SIMILARITY_SMILES = np.array([
+    "CC(C)(C)NCC(C1=CC=C(C=C1)O)O",
+    "CC(C)NCC(C1=CC(=C(C=C1)O)CO)O",
+    "CCNCC(C1=CC(=C(C=C1)O)CO)O"
+])
+SIMILARITY_SCORES = np.array([0.89, 0.84, 0.78], dtype=np.float32)
+
+def top_similar(scores, threshold, max_results):
+    """Indices of the best max_results scores at or above threshold, best first"""
+    candidates = np.flatnonzero(scores >= threshold)
+    if candidates.size > max_results:
+        candidates = candidates[np.argpartition(-scores[candidates], max_results - 1)[:max_results]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def _load_transformer_model(model_name):
+    """Load a single transformer DTI model"""
+    return {"name": model_name, "task": "DTI", "status": "loaded", "loaded_at": time.time()}
+
+@st.cache_resource(show_spinner=False)
+def get_transformer_models():
+    """Load all transformer DTI models once per process"""
+    return {name: _load_transformer_model(name) for name in TRANSFORMER_MODELS}
+
 def main():
     """Main application function"""
     # Header
@@ -30,28 +64,8 @@ def main():
     st.sidebar.markdown("---")
     
     # Transformer DTI Model Preloader
-    st.sidebar.subheader("🚀 Transformer DTI Models")
-    
-    # Available models list
-    transformer_models = [
-        "SciBERT-DTI", "PubMedBERT-DTI", "ChemBERTa-DTI", "MolBERT-DTI",
-        "GPT2-DTI", "BERT-Base-DTI", "T5-Small-DTI", "ELECTRA-Small-DTI",
-        "ALBERT-Base-DTI", "DeBERTa-V3-Small", "XLNet-Base-DTI", "BART-Base-DTI",
-        "MPNet-Base-DTI", "Longformer-Base-DTI", "BigBird-Base-DTI",
-        "Reformer-DTI", "Pegasus-Small-DTI", "FNet-Base-DTI",
-        "Funnel-Transformer-DTI", "LED-Base-DTI"
-    ]
-    
-    st.sidebar.success(f"✓ {len(transformer_models)} models available")
-    with st.sidebar.expander("Available Models"):
-        for model in transformer_models:
-            st.write(f"• {model}")
-    
-    # Load button
-    if st.sidebar.button("Load All Transformer Models", type="primary"):
-        with st.spinner("Loading transformer DTI models..."):
-            st.sidebar.success("Models loaded successfully!")
-            st.rerun()
+    with st.sidebar:
+        render_model_preloader()
     
     st.sidebar.markdown("---")
     
@@ -67,40 +81,67 @@ def main():
     elif current_task == "Similarity":
         render_similarity_interface()
 
+@st.fragment
+def render_model_preloader():
+    """Render the transformer model preloader; clicks rerun only this block"""
+    st.subheader("🚀 Transformer DTI Models")
+    
+    st.success(f"✓ {len(TRANSFORMER_MODELS)} models available")
+    with st.expander("Available Models"):
+        st.markdown(_MODELS_MD)
+    
+    # Load button
+    if st.button("Load All Transformer Models", type="primary"):
+        with st.spinner("Loading transformer DTI models..."):
+            loaded = get_transformer_models()
+        st.success(f"{len(loaded)} models loaded successfully!")
+
+def set_sample(state_key, value):
+    """Fill an input with sample data before the rerun renders it"""
+    st.session_state[state_key] = value
+
+@st.fragment
 def render_dti_interface():
     """Render DTI prediction interface"""
     st.header("🎯 Drug-Target Interaction (DTI) Prediction")
     
+    # Sample data buttons sit outside the form so they can fill its inputs
     col1, col2 = st.columns(2)
-    
     with col1:
-        st.subheader("Drug Input")
-        drug_smiles = st.text_area(
-            "SMILES String",
-            placeholder="Enter drug SMILES (e.g., CC(=O)OC1=CC=CC=C1C(=O)O)",
-            height=100
-        )
-        
-        # Sample data button
-        if st.button("Use Sample Drug", key="sample_drug_dti"):
-            st.session_state.drug_smiles_dti = "CC(=O)OC1=CC=CC=C1C(=O)O"  # Aspirin
-            st.rerun()
-    
+        st.button("Use Sample Drug", key="sample_drug_dti", on_click=set_sample,
+                  args=("drug_smiles_dti", "CC(=O)OC1=CC=CC=C1C(=O)O"))  # Aspirin
     with col2:
-        st.subheader("Target Input")
-        target_sequence = st.text_area(
-            "Protein Sequence",
-            placeholder="Enter target protein sequence (FASTA format)",
-            height=100
-        )
+        st.button("Use Sample Target", key="sample_target_dti", on_click=set_sample,
+                  args=("target_sequence_dti", "MKVLWAALLVTFLAGCQAKVEQAVETEPEPELRQQTEWQSGQRWELALGRFWDYLRWVQTLSEQVQEELLSSQVTQELRALMDETAQALPQPVRQLLSSQVTQELRALMDETAQ"))
+    
+    with st.form("dti_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Drug Input")
+            drug_smiles = st.text_area(
+                "SMILES String",
+                placeholder="Enter drug SMILES (e.g., CC(=O)OC1=CC=CC=C1C(=O)O)",
+                height=100,
+                key="drug_smiles_dti"
+            )
+        
+        with col2:
+            st.subheader("Target Input")
+            target_sequence = st.text_area(
+                "Protein Sequence",
+                placeholder="Enter target protein sequence (FASTA format)",
+                height=100,
+                key="target_sequence_dti"
+            )
         
-        # Sample data button
-        if st.button("Use Sample Target", key="sample_target_dti"):
-            st.session_state.target_sequence_dti = "MKVLWAALLVTFLAGCQAKVEQAVETEPEPELRQQTEWQSGQRWELALGRFWDYLRWVQTLSEQVQEELLSSQVTQELRALMDETAQALPQPVRQLLSSQVTQELRALMDETAQ"
-            st.rerun()
+        submitted = st.form_submit_button("Predict DTI", type="primary")
     
-    # Prediction button
-    if st.button("Predict DTI", type="primary", disabled=not (drug_smiles and target_sequence)):
+    if submitted:
+        if not (drug_smiles and target_sequence):
+            st.warning("Please enter both a drug SMILES and a target sequence")
+            return
+        
         with st.spinner("Predicting drug-target interaction..."):
             # Simulate prediction
             prediction_score = 0.85
@@ -117,71 +158,92 @@ def render_dti_interface():
             with col3:
                 st.metric("Model Used", "SciBERT-DTI")
 
+@st.fragment
 def render_dta_interface():
     """Render DTA prediction interface"""
     st.header("⚖️ Drug-Target Binding Affinity (DTA) Prediction")
     st.info("Predict binding affinity between drug compounds and target proteins")
     
     col1, col2 = st.columns(2)
-    
     with col1:
-        drug_smiles = st.text_area("Drug SMILES", height=100)
-        if st.button("Use Sample Drug", key="sample_drug_dta"):
-            st.session_state.drug_smiles_dta = "CCO"  # Ethanol
-    
+        st.button("Use Sample Drug", key="sample_drug_dta", on_click=set_sample,
+                  args=("drug_smiles_dta", "CCO"))  # Ethanol
     with col2:
-        target_sequence = st.text_area("Target Sequence", height=100)
-        affinity_type = st.selectbox("Affinity Type", ["IC50", "Kd", "Ki"])
-        if st.button("Use Sample Target", key="sample_target_dta"):
-            st.session_state.target_sequence_dta = "MKVLWAALLVTFLAGCQAKVEQAVETEPEPELR"
+        st.button("Use Sample Target", key="sample_target_dta", on_click=set_sample,
+                  args=("target_sequence_dta", "MKVLWAALLVTFLAGCQAKVEQAVETEPEPELR"))
+    
+    with st.form("dta_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            drug_smiles = st.text_area("Drug SMILES", height=100, key="drug_smiles_dta")
+        
+        with col2:
+            target_sequence = st.text_area("Target Sequence", height=100, key="target_sequence_dta")
+            affinity_type = st.selectbox("Affinity Type", ["IC50", "Kd", "Ki"])
+        
+        submitted = st.form_submit_button("Predict Binding Affinity", type="primary")
     
-    if st.button("Predict Binding Affinity", type="primary"):
+    if submitted:
         with st.spinner("Calculating binding affinity..."):
             affinity_value = 125.3
             st.success(f"Predicted {affinity_type}: {affinity_value:.2f} nM")
 
+@st.fragment
 def render_ddi_interface():
     """Render DDI prediction interface"""
     st.header("💊 Drug-Drug Interaction (DDI) Prediction")
     st.info("Analyze potential interactions between drug compounds")
     
     col1, col2 = st.columns(2)
-    
     with col1:
-        st.subheader("Drug 1")
-        drug1_smiles = st.text_area("Drug 1 SMILES", height=100)
-        if st.button("Use Sample Drug 1", key="sample_drug1"):
-            st.session_state.drug1_smiles = "CC(=O)OC1=CC=CC=C1C(=O)O"  # Aspirin
-    
+        st.button("Use Sample Drug 1", key="sample_drug1", on_click=set_sample,
+                  args=("drug1_smiles", "CC(=O)OC1=CC=CC=C1C(=O)O"))  # Aspirin
     with col2:
-        st.subheader("Drug 2")
-        drug2_smiles = st.text_area("Drug 2 SMILES", height=100)
-        if st.button("Use Sample Drug 2", key="sample_drug2"):
-            st.session_state.drug2_smiles = "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O"  # Ibuprofen
+        st.button("Use Sample Drug 2", key="sample_drug2", on_click=set_sample,
+                  args=("drug2_smiles", "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O"))  # Ibuprofen
     
-    interaction_type = st.selectbox("Interaction Type", ["Synergistic", "Antagonistic", "Unknown"])
+    with st.form("ddi_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Drug 1")
+            drug1_smiles = st.text_area("Drug 1 SMILES", height=100, key="drug1_smiles")
+        
+        with col2:
+            st.subheader("Drug 2")
+            drug2_smiles = st.text_area("Drug 2 SMILES", height=100, key="drug2_smiles")
+        
+        interaction_type = st.selectbox("Interaction Type", ["Synergistic", "Antagonistic", "Unknown"])
+        
+        submitted = st.form_submit_button("Predict DDI", type="primary")
     
-    if st.button("Predict DDI", type="primary"):
+    if submitted:
         with st.spinner("Analyzing drug-drug interaction..."):
             interaction_score = 0.73
             st.warning(f"Potential {interaction_type.lower()} interaction detected: {interaction_score:.3f}")
 
+@st.fragment
 def render_admet_interface():
     """Render ADMET prediction interface"""
     st.header("🧪 ADMET Properties Prediction")
     st.info("Predict Absorption, Distribution, Metabolism, Excretion, and Toxicity")
     
-    drug_smiles = st.text_area("Drug SMILES", height=100)
-    if st.button("Use Sample Drug", key="sample_drug_admet"):
-        st.session_state.drug_smiles_admet = "CN1CCC[C@H]1C2=CN=CC=C2"  # Nicotine
+    st.button("Use Sample Drug", key="sample_drug_admet", on_click=set_sample,
+              args=("drug_smiles_admet", "CN1CCC[C@H]1C2=CN=CC=C2"))  # Nicotine
     
-    properties = st.multiselect(
-        "Select ADMET Properties",
-        ["Absorption", "Distribution", "Metabolism", "Excretion", "Toxicity", "LogP", "Solubility"],
-        default=["Absorption", "Toxicity"]
-    )
+    with st.form("admet_form"):
+        drug_smiles = st.text_area("Drug SMILES", height=100, key="drug_smiles_admet")
+        
+        properties = st.multiselect(
+            "Select ADMET Properties",
+            ["Absorption", "Distribution", "Metabolism", "Excretion", "Toxicity", "LogP", "Solubility"],
+            default=["Absorption", "Toxicity"]
+        )
+        
+        submitted = st.form_submit_button("Predict ADMET", type="primary")
     
-    if st.button("Predict ADMET", type="primary"):
+    if submitted:
         with st.spinner("Calculating ADMET properties..."):
             st.subheader("ADMET Results")
             
@@ -195,42 +257,47 @@ def render_admet_interface():
                 "Solubility": 0.68
             }
             
-            for prop in properties:
-                if prop in results:
-                    st.metric(prop, f"{results[prop]:.3f}")
+            shown = [prop for prop in properties if prop in results]
+            st.dataframe(pd.DataFrame({
+                "Property": shown,
+                "Value": [round(results[prop], 3) for prop in shown]
+            }), hide_index=True)
 
+@st.fragment
 def render_similarity_interface():
     """Render molecular similarity interface"""
     st.header("🔍 Molecular Similarity Search")
     st.info("Find structurally similar compounds")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        query_smiles = st.text_area("Query SMILES", height=100)
-        if st.button("Use Sample Query", key="sample_query"):
-            st.session_state.query_smiles = "CC(C)(C)NCC(C1=CC(=C(C=C1)O)CO)O"  # Salbutamol
+    st.button("Use Sample Query", key="sample_query", on_click=set_sample,
+              args=("query_smiles", "CC(C)(C)NCC(C1=CC(=C(C=C1)O)CO)O"))  # Salbutamol
     
-    with col2:
-        threshold = st.slider("Similarity Threshold", 0.0, 1.0, 0.7, 0.05)
-        method = st.selectbox("Similarity Method", ["Tanimoto", "Dice", "Cosine"])
-        max_results = st.number_input("Max Results", 1, 50, 10)
+    with st.form("similarity_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            query_smiles = st.text_area("Query SMILES", height=100, key="query_smiles")
+        
+        with col2:
+            threshold = st.slider("Similarity Threshold", 0.0, 1.0, 0.7, 0.05)
+            method = st.selectbox("Similarity Method", ["Tanimoto", "Dice", "Cosine"])
+            max_results = st.number_input("Max Results", 1, 50, 10)
+        
+        submitted = st.form_submit_button("Search Similar Compounds", type="primary")
     
-    if st.button("Search Similar Compounds", type="primary"):
+    if submitted:
         with st.spinner("Searching for similar compounds..."):
             st.subheader("Similar Compounds Found")
             
-            # Simulate similarity results
-            similar_compounds = [
-                {"smiles": "CC(C)(C)NCC(C1=CC=C(C=C1)O)O", "similarity": 0.89, "name": "Compound A"},
-                {"smiles": "CC(C)NCC(C1=CC(=C(C=C1)O)CO)O", "similarity": 0.84, "name": "Compound B"},
-                {"smiles": "CCNCC(C1=CC(=C(C=C1)O)CO)O", "similarity": 0.78, "name": "Compound C"}
-            ]
-            
-            for i, compound in enumerate(similar_compounds[:max_results]):
-                if compound["similarity"] >= threshold:
-                    st.write(f"**{compound['name']}** - Similarity: {compound['similarity']:.3f}")
-                    st.code(compound["smiles"])
+            idx = top_similar(SIMILARITY_SCORES, threshold, int(max_results))
+            if idx.size:
+                st.dataframe(pd.DataFrame({
+                    "Name": SIMILARITY_NAMES[idx],
+                    "Similarity": SIMILARITY_SCORES[idx].round(3),
+                    "SMILES": SIMILARITY_SMILES[idx]
+                }), hide_index=True)
+            else:
+                st.info("No compounds found above the similarity threshold")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,7 +9,21 @@ from typing import Union
 
 # Import both user management systems
 from auth.user_management import UserManager as SQLiteUserManager
-from auth.external_db_connector import ExternalDBUserManager
+from auth.external_db_connector import ExternalDBUserManager, describe_database_url
+
+@st.cache_resource(show_spinner=False)
+def _build_external_manager(database_url: str) -> ExternalDBUserManager:
+    """Build the PostgreSQL user manager once per process for the given URL
+
+    Failures raise instead of returning, so nothing is cached and the next
+    call retries the connection.
+    """
+    return ExternalDBUserManager(database_url)
+
+@st.cache_resource(show_spinner=False)
+def _build_sqlite_manager() -> SQLiteUserManager:
+    """Build the SQLite user manager once per process"""
+    return SQLiteUserManager()
 
 class DatabaseConfig:
     """Handles database configuration and user manager selection"""
@@ -27,16 +41,13 @@ class DatabaseConfig:
         
         if database_url:
             try:
-                # Test PostgreSQL connection
-                pg_manager = ExternalDBUserManager(database_url)
-                st.success("✅ Connected to PostgreSQL database (emdcian_website)")
-                return pg_manager
+                return _build_external_manager(database_url)
             except Exception as e:
                 st.error(f"❌ PostgreSQL setup failed: {e}")
                 st.info("📝 Falling back to SQLite")
         
         # Fallback to SQLite
-        return SQLiteUserManager()
+        return _build_sqlite_manager()
     
     @staticmethod
     def is_postgresql_configured() -> bool:
@@ -53,16 +64,11 @@ class DatabaseConfig:
             if database_url.startswith('postgresql://'):
                 # Extract host info for display
                 try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(database_url)
-                    host_info = f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
                     return {
-                        'type': 'PostgreSQL',
-                        'host': host_info,
-                        'database': parsed.path.lstrip('/'),
+                        **describe_database_url(database_url),
                         'status': 'configured'
                     }
-                except:
+                except ValueError:
                     return {
                         'type': 'PostgreSQL',
                         'host': 'configured',
@@ -5,14 +5,199 @@ Simple PostgreSQL connector to connect to emdcian_website database
 
 import os
 import psycopg2
+from psycopg2.extensions import connection as PGConnection
 from psycopg2.extras import RealDictCursor
-import hashlib
+from psycopg2.pool import ThreadedConnectionPool
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
+from urllib.parse import urlparse
 from typing import Dict, Optional, List
+from auth import passwords
+from auth.rate_limit import check_login_attempt
+
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 16
+USAGE_TRACKING_WORKERS = 2
+READ_CACHE_TTL_SECONDS = 60
+
+# Schema for PharmQAgentAI tables, sent to the server in a single round trip
+SCHEMA_DDL = """
+    CREATE TABLE IF NOT EXISTS pharmq_users (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        full_name VARCHAR(255) NOT NULL,
+        organization VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE
+    );
+    
+    CREATE TABLE IF NOT EXISTS pharmq_subscriptions (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES pharmq_users(id),
+        plan_type VARCHAR(50) NOT NULL,
+        start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        end_date TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE
+    );
+    
+    CREATE TABLE IF NOT EXISTS pharmq_usage_tracking (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES pharmq_users(id),
+        feature VARCHAR(100) NOT NULL,
+        usage_count INTEGER DEFAULT 1,
+        last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    -- Before the unique index exists, fold duplicate usage rows into the oldest one
+    DO $$
+    BEGIN
+        IF to_regclass('pharmq_usage_tracking_user_feature_idx') IS NULL THEN
+            LOCK TABLE pharmq_usage_tracking IN SHARE ROW EXCLUSIVE MODE;
+            WITH totals AS (
+                SELECT MIN(id) AS keep_id, user_id, feature,
+                       SUM(usage_count) AS usage_count, MAX(last_used) AS last_used
+                FROM pharmq_usage_tracking
+                WHERE user_id IS NOT NULL
+                GROUP BY user_id, feature
+                HAVING COUNT(*) > 1
+            ), merged AS (
+                UPDATE pharmq_usage_tracking u
+                SET usage_count = t.usage_count, last_used = t.last_used
+                FROM totals t
+                WHERE u.id = t.keep_id
+            )
+            DELETE FROM pharmq_usage_tracking u
+            USING totals t
+            WHERE u.user_id = t.user_id AND u.feature = t.feature AND u.id <> t.keep_id;
+        END IF;
+    END $$;
+    
+    -- One usage row per user and feature, required by the track_usage upsert
+    CREATE UNIQUE INDEX IF NOT EXISTS pharmq_usage_tracking_user_feature_idx
+    ON pharmq_usage_tracking(user_id, feature);
+    
+    -- Active subscription lookups and deactivation by user
+    CREATE INDEX IF NOT EXISTS idx_subs_active_user
+    ON pharmq_subscriptions(user_id, start_date DESC) WHERE is_active = TRUE;
+    
+    -- Index-only scans for get_usage_stats
+    CREATE INDEX IF NOT EXISTS idx_usage_user
+    ON pharmq_usage_tracking(user_id) INCLUDE (feature, usage_count, last_used);
+"""
+
+# Server-side prepared statements for the login and usage-tracking hot paths
+PREPARED_STATEMENTS = {
+    'auth_user': """
+        PREPARE auth_user (text) AS
+        SELECT id, email, full_name, organization, created_at, last_login, password_hash
+        FROM pharmq_users
+        WHERE email = $1 AND is_active = TRUE
+    """,
+    'track_usage': """
+        PREPARE track_usage (integer, text) AS
+        INSERT INTO pharmq_usage_tracking (user_id, feature, usage_count, last_used)
+        VALUES ($1, $2, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id, feature) DO UPDATE
+        SET usage_count = pharmq_usage_tracking.usage_count + 1,
+            last_used = CURRENT_TIMESTAMP
+    """
+}
+
+class _PooledConnection(PGConnection):
+    """Connection that remembers which statements it has prepared"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+    
+    def prepare(self, name: str):
+        """Prepare a statement from PREPARED_STATEMENTS on first use"""
+        if name not in self.prepared_statements:
+            with self.cursor() as cursor:
+                cursor.execute(PREPARED_STATEMENTS[name])
+            self.prepared_statements.add(name)
+
+@st.cache_resource(show_spinner=False)
+def _get_pool(database_url: str) -> ThreadedConnectionPool:
+    """Get the process-wide connection pool for a database URL"""
+    return ThreadedConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, database_url,
+                                  connection_factory=_PooledConnection)
+
+@st.cache_resource(show_spinner=False)
+def _get_usage_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor for background usage tracking"""
+    return ThreadPoolExecutor(max_workers=USAGE_TRACKING_WORKERS, thread_name_prefix="pharmq_usage")
+
+@lru_cache(maxsize=None)
+def describe_database_url(database_url: str) -> Dict[str, str]:
+    """Describe a PostgreSQL URL for display, leaving out the credentials
+    
+    urlparse itself does not validate; only a malformed port raises ValueError.
+    """
+    parsed = urlparse(database_url)
+    host_info = f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
+    return {
+        'type': 'PostgreSQL',
+        'host': host_info,
+        'database': parsed.path.lstrip('/')
+    }
+
+@contextmanager
+def _borrow_connection(pool: ThreadedConnectionPool):
+    """Borrow a connection from a pool, returning it when done"""
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, show_spinner=False)
+def _get_subscription(database_url: str, user_id: int) -> Optional[Dict]:
+    """Fetch the active subscription for a user"""
+    with _borrow_connection(_get_pool(database_url)) as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute("""
+            SELECT id, plan_type, start_date, end_date, is_active
+            FROM pharmq_subscriptions 
+            WHERE user_id = %s AND is_active = TRUE
+            ORDER BY start_date DESC LIMIT 1
+        """, (user_id,))
+        
+        subscription = cursor.fetchone()
+    
+    return dict(subscription) if subscription else None
+
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, show_spinner=False)
+def _get_usage_stats(database_url: str, user_id: int) -> Dict:
+    """Fetch aggregated usage statistics for a user"""
+    with _borrow_connection(_get_pool(database_url)) as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute("""
+            SELECT COALESCE(SUM(usage_count), 0) AS total_predictions,
+                   MAX(last_used) AS last_activity,
+                   COALESCE(jsonb_object_agg(feature, usage_count) FILTER (WHERE feature IS NOT NULL),
+                            '{}'::jsonb) AS features_used
+            FROM pharmq_usage_tracking 
+            WHERE user_id = %s
+        """, (user_id,))
+        
+        record = cursor.fetchone()
+    
+    return {
+        'total_predictions': record['total_predictions'],
+        'features_used': record['features_used'],
+        'last_activity': record['last_activity']
+    }
 
 class ExternalDBUserManager:
     """Simple PostgreSQL user manager for external database connection"""
     
+    # Database URLs whose schema has already been created in this process
+    _initialized_databases = set()
+    
     def __init__(self, database_url: str = None):
         """Initialize with database URL"""
         self.database_url = database_url or os.getenv('DATABASE_URL')
@@ -20,24 +205,23 @@ class ExternalDBUserManager:
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable must be set")
         
+        self._pool = _get_pool(self.database_url)
+        
         # Test connection on initialization
         self.test_connection()
         
         # Initialize tables if they don't exist
         self.init_tables()
     
-    def get_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(self.database_url)
+    def _conn(self):
+        """Borrow a connection from the pool"""
+        return _borrow_connection(self._pool)
     
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            conn.close()
+            with self._conn() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
             print("✅ Successfully connected to external PostgreSQL database")
             return True
         except Exception as e:
@@ -46,50 +230,14 @@ class ExternalDBUserManager:
     
     def init_tables(self):
         """Initialize required tables if they don't exist"""
+        if self.database_url in ExternalDBUserManager._initialized_databases:
+            return
+        
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Create users table for PharmQAgentAI
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pharmq_users (
-                    id SERIAL PRIMARY KEY,
-                    email VARCHAR(255) UNIQUE NOT NULL,
-                    password_hash VARCHAR(255) NOT NULL,
-                    full_name VARCHAR(255) NOT NULL,
-                    organization VARCHAR(255),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_login TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            """)
-            
-            # Create subscriptions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pharmq_subscriptions (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER REFERENCES pharmq_users(id),
-                    plan_type VARCHAR(50) NOT NULL,
-                    start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    end_date TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            """)
-            
-            # Create usage tracking table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pharmq_usage_tracking (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER REFERENCES pharmq_users(id),
-                    feature VARCHAR(100) NOT NULL,
-                    usage_count INTEGER DEFAULT 1,
-                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
+            with self._conn() as conn, conn.cursor() as cursor:
+                cursor.execute(SCHEMA_DDL)
+                conn.commit()
+            ExternalDBUserManager._initialized_databases.add(self.database_url)
             print("✅ Database tables initialized successfully")
             
         except Exception as e:
@@ -97,42 +245,39 @@ class ExternalDBUserManager:
             raise e
     
     def hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password using Argon2id, or salted scrypt without argon2-cffi"""
+        return passwords.hash_password(password)
+    
+    def verify_password(self, password_hash: Optional[str], password: str) -> bool:
+        """Check a password against a stored hash in constant time"""
+        return passwords.verify_password(password_hash, password)
+    
+    def password_needs_rehash(self, password_hash: str) -> bool:
+        """Check whether a stored hash uses outdated parameters or algorithm"""
+        return passwords.password_needs_rehash(password_hash)
     
     def register_user(self, email: str, password: str, full_name: str, organization: str = None) -> bool:
         """Register a new user"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if user already exists
-            cursor.execute("SELECT id FROM pharmq_users WHERE email = %s", (email,))
-            if cursor.fetchone():
-                cursor.close()
-                conn.close()
-                return False
-            
-            # Create new user
             password_hash = self.hash_password(password)
-            cursor.execute("""
-                INSERT INTO pharmq_users (email, password_hash, full_name, organization)
-                VALUES (%s, %s, %s, %s) RETURNING id
-            """, (email, password_hash, full_name, organization))
-            
-            user_id = cursor.fetchone()[0]
-            
-            # Create default starter subscription
-            end_date = datetime.now() + timedelta(days=30)
-            cursor.execute("""
-                INSERT INTO pharmq_subscriptions (user_id, plan_type, end_date)
-                VALUES (%s, %s, %s)
-            """, (user_id, "Starter", end_date))
             
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return True
+            with self._conn() as conn, conn.cursor() as cursor:
+                # Create the user and a starter subscription; an existing email inserts nothing
+                cursor.execute("""
+                    WITH new_user AS (
+                        INSERT INTO pharmq_users (email, password_hash, full_name, organization)
+                        VALUES (%s, %s, %s, %s)
+                        ON CONFLICT (email) DO NOTHING
+                        RETURNING id
+                    )
+                    INSERT INTO pharmq_subscriptions (user_id, plan_type, end_date)
+                    SELECT id, 'Starter', CURRENT_TIMESTAMP + INTERVAL '30 days' FROM new_user
+                    RETURNING user_id
+                """, (email, password_hash, full_name, organization))
+                
+                created = cursor.fetchone() is not None
+                conn.commit()
+            return created
             
         except Exception as e:
             print(f"Error registering user: {e}")
@@ -140,32 +285,32 @@ class ExternalDBUserManager:
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
+        check_login_attempt(email)
+        
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            password_hash = self.hash_password(password)
-            cursor.execute("""
-                SELECT id, email, full_name, organization, created_at, last_login
-                FROM pharmq_users 
-                WHERE email = %s AND password_hash = %s AND is_active = TRUE
-            """, (email, password_hash))
-            
-            user = cursor.fetchone()
-            
-            if user:
-                # Update last login
-                cursor.execute("""
-                    UPDATE pharmq_users SET last_login = CURRENT_TIMESTAMP WHERE id = %s
-                """, (user['id'],))
-                conn.commit()
+            with self._conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                conn.prepare('auth_user')
+                cursor.execute("EXECUTE auth_user (%s)", (email,))
+                
+                user = cursor.fetchone()
                 
-                cursor.close()
-                conn.close()
-                return dict(user)
+                if self.verify_password(user['password_hash'] if user else None, password):
+                    # Update last login, upgrading the stored hash if needed
+                    if self.password_needs_rehash(user['password_hash']):
+                        cursor.execute("""
+                            UPDATE pharmq_users SET last_login = CURRENT_TIMESTAMP, password_hash = %s
+                            WHERE id = %s
+                        """, (self.hash_password(password), user['id']))
+                    else:
+                        cursor.execute("""
+                            UPDATE pharmq_users SET last_login = CURRENT_TIMESTAMP WHERE id = %s
+                        """, (user['id'],))
+                    conn.commit()
+                    
+                    user_data = dict(user)
+                    del user_data['password_hash']
+                    return user_data
             
-            cursor.close()
-            conn.close()
             return None
             
         except Exception as e:
@@ -175,21 +320,7 @@ class ExternalDBUserManager:
     def get_user_subscription(self, user_id: int) -> Optional[Dict]:
         """Get active subscription for user"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT id, plan_type, start_date, end_date, is_active
-                FROM pharmq_subscriptions 
-                WHERE user_id = %s AND is_active = TRUE
-                ORDER BY start_date DESC LIMIT 1
-            """, (user_id,))
-            
-            subscription = cursor.fetchone()
-            cursor.close()
-            conn.close()
-            
-            return dict(subscription) if subscription else None
+            return _get_subscription(self.database_url, user_id)
             
         except Exception as e:
             print(f"Error getting user subscription: {e}")
@@ -198,25 +329,20 @@ class ExternalDBUserManager:
     def create_subscription(self, user_id: int, plan_type: str, duration_days: int = 30) -> bool:
         """Create new subscription for user"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Deactivate existing subscriptions
-            cursor.execute("""
-                UPDATE pharmq_subscriptions SET is_active = FALSE 
-                WHERE user_id = %s AND is_active = TRUE
-            """, (user_id,))
-            
-            # Create new subscription
-            end_date = datetime.now() + timedelta(days=duration_days)
-            cursor.execute("""
-                INSERT INTO pharmq_subscriptions (user_id, plan_type, end_date)
-                VALUES (%s, %s, %s)
-            """, (user_id, plan_type, end_date))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
+            with self._conn() as conn, conn.cursor() as cursor:
+                # Deactivate existing subscriptions and create the new one in a single statement
+                end_date = datetime.now() + timedelta(days=duration_days)
+                cursor.execute("""
+                    WITH deactivated AS (
+                        UPDATE pharmq_subscriptions SET is_active = FALSE 
+                        WHERE user_id = %s AND is_active = TRUE
+                    )
+                    INSERT INTO pharmq_subscriptions (user_id, plan_type, end_date)
+                    VALUES (%s, %s, %s)
+                """, (user_id, user_id, plan_type, end_date))
+                
+                conn.commit()
+            _get_subscription.clear(self.database_url, user_id)
             return True
             
         except Exception as e:
@@ -224,36 +350,18 @@ class ExternalDBUserManager:
             return False
     
     def track_usage(self, user_id: int, feature: str):
-        """Track feature usage for analytics"""
+        """Track feature usage for analytics without blocking the caller"""
+        _get_usage_executor().submit(self._track_usage_sync, user_id, feature)
+    
+    def _track_usage_sync(self, user_id: int, feature: str):
+        """Record a feature usage in the database"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if usage record exists
-            cursor.execute("""
-                SELECT id, usage_count FROM pharmq_usage_tracking 
-                WHERE user_id = %s AND feature = %s
-            """, (user_id, feature))
-            
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing record
-                cursor.execute("""
-                    UPDATE pharmq_usage_tracking 
-                    SET usage_count = usage_count + 1, last_used = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (existing[0],))
-            else:
-                # Create new record
-                cursor.execute("""
-                    INSERT INTO pharmq_usage_tracking (user_id, feature, usage_count)
-                    VALUES (%s, %s, 1)
-                """, (user_id, feature))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
+            with self._conn() as conn, conn.cursor() as cursor:
+                conn.prepare('track_usage')
+                cursor.execute("EXECUTE track_usage (%s, %s)", (user_id, feature))
+                
+                conn.commit()
+            _get_usage_stats.clear(self.database_url, user_id)
             
         except Exception as e:
             print(f"Error tracking usage: {e}")
@@ -261,33 +369,7 @@ class ExternalDBUserManager:
     def get_usage_stats(self, user_id: int) -> Dict:
         """Get usage statistics for user"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT feature, usage_count, last_used
-                FROM pharmq_usage_tracking 
-                WHERE user_id = %s
-            """, (user_id,))
-            
-            records = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-            stats = {
-                'total_predictions': 0,
-                'features_used': {},
-                'last_activity': None
-            }
-            
-            for record in records:
-                stats['features_used'][record['feature']] = record['usage_count']
-                stats['total_predictions'] += record['usage_count']
-                
-                if stats['last_activity'] is None or record['last_used'] > stats['last_activity']:
-                    stats['last_activity'] = record['last_used']
-            
-            return stats
+            return _get_usage_stats(self.database_url, user_id)
             
         except Exception as e:
             print(f"Error getting usage stats: {e}")
@@ -296,17 +378,12 @@ class ExternalDBUserManager:
     def get_database_info(self) -> Dict:
         """Get database connection information"""
         try:
-            from urllib.parse import urlparse
-            parsed = urlparse(self.database_url)
-            host_info = f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
             return {
-                'type': 'PostgreSQL',
-                'host': host_info,
-                'database': parsed.path.lstrip('/'),
+                **describe_database_url(self.database_url),
                 'status': 'connected',
                 'tables': ['pharmq_users', 'pharmq_subscriptions', 'pharmq_usage_tracking']
             }
-        except:
+        except ValueError:
             return {
                 'type': 'PostgreSQL',
                 'host': 'external',
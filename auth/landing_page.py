@@ -4,7 +4,34 @@ Landing Page and Authentication Interface for PharmQAgentAI
 
 import streamlit as st
 from auth.user_management import UserManager, SubscriptionPlans
+from auth.rate_limit import LoginRateLimited
+import base64
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+# Hero banner, inlined so the landing page makes no request for it
+_HERO_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="600" height="300" viewBox="0 0 600 300">
+<rect width="600" height="300" fill="#1f77b4"/>
+<text x="300" y="150" fill="#ffffff" font-family="sans-serif" font-size="36" text-anchor="middle" dominant-baseline="middle">PharmQAgentAI Platform</text>
+</svg>"""
+_HERO_IMAGE_HTML = (
+    '<img src="data:image/svg+xml;base64,'
+    + base64.b64encode(_HERO_SVG.encode()).decode()
+    + '" alt="PharmQAgentAI Platform" style="width: 100%;">'
+)
+
+# Session state keys used by the authentication flow and their initial values
+_AUTH_SESSION_DEFAULTS = {
+    'authenticated': False,
+    'user_data': None,
+    'subscription': None,
+    'selected_plan': 'Professional',
+    'show_signup': False,
+    'auth_error': None,
+    'signup_error': None,
+    'signup_success': None
+}
 
 def render_landing_page():
     """Render the main landing page with pricing and signup"""
@@ -28,7 +55,7 @@ def render_landing_page():
     # Hero Section
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.image("https://via.placeholder.com/600x300/1f77b4/ffffff?text=PharmQAgentAI+Platform", use_column_width=True)
+        st.markdown(_HERO_IMAGE_HTML, unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -71,24 +98,25 @@ def render_landing_page():
     
     plan_col1, plan_col2, plan_col3 = st.columns(3)
     
-    plans = SubscriptionPlans.PLANS
-    
     with plan_col1:
-        render_plan_card("Starter", plans["Starter"])
+        render_plan_card("Starter")
     
     with plan_col2:
-        render_plan_card("Professional", plans["Professional"], featured=True)
+        render_plan_card("Professional", featured=True)
     
     with plan_col3:
-        render_plan_card("Enterprise", plans["Enterprise"])
+        render_plan_card("Enterprise")
 
-def render_plan_card(plan_name: str, plan_details: dict, featured: bool = False):
-    """Render individual subscription plan card"""
+@lru_cache(maxsize=None)
+def _plan_card_html(plan_name: str, featured: bool = False) -> str:
+    """Build the card and features list HTML for a subscription plan"""
     
+    plan_details = SubscriptionPlans.PLANS[plan_name]
     border_color = "#1f77b4" if featured else "#ddd"
     background_color = "#f8f9fa" if featured else "#fff"
+    features_html = "".join(f"<li>✓ {feature}</li>" for feature in plan_details['features'])
     
-    card_html = f"""
+    return f"""
     <div style="
         border: 2px solid {border_color};
         border-radius: 10px;
@@ -109,14 +137,14 @@ def render_plan_card(plan_name: str, plan_details: dict, featured: bool = False)
             {plan_details['description']}
         </p>
     </div>
+    <p><strong>Features:</strong></p>
+    <ul style="list-style: none; padding-left: 0;">{features_html}</ul>
     """
+
+def render_plan_card(plan_name: str, featured: bool = False):
+    """Render individual subscription plan card"""
     
-    st.markdown(card_html, unsafe_allow_html=True)
-    
-    # Features list
-    st.markdown("**Features:**")
-    for feature in plan_details['features']:
-        st.write(f"✓ {feature}")
+    st.markdown(_plan_card_html(plan_name, featured), unsafe_allow_html=True)
     
     # Subscribe button
     if st.button(f"Choose {plan_name}", key=f"select_{plan_name}", use_container_width=True):
@@ -152,15 +180,16 @@ def render_login_form(user_manager: UserManager):
         
         if login_clicked:
             if email and password:
-                user_data = user_manager.authenticate_user(email, password)
+                try:
+                    user_data, subscription = user_manager.login_with_subscription(email, password)
+                except LoginRateLimited as e:
+                    st.error(str(e))
+                    return
                 
                 if user_data:
                     st.session_state.authenticated = True
                     st.session_state.user_data = user_data
-                    
-                    # Get subscription
-                    subscription = user_manager.get_user_subscription(user_data['id'])
-                    st.session_state.subscription = subscription
+                    set_session_subscription(subscription)
                     
                     st.success(f"Welcome back, {user_data['full_name']}!")
                     st.rerun()
@@ -207,72 +236,77 @@ def render_signup_form(user_manager: UserManager):
             elif not terms_accepted:
                 st.error("Please accept the terms and conditions")
             else:
-                # Register user
-                if user_manager.register_user(email, password, full_name, organization):
-                    # Authenticate the new user
-                    user_data = user_manager.authenticate_user(email, password)
+                # Register the user, getting their data back without a second login
+                user_data = user_manager.register_and_login(email, password, full_name, organization)
+                
+                if user_data:
+                    # Create subscription
+                    duration_days = 30 if selected_plan != "Enterprise" else 365
+                    subscription = user_manager.subscribe(
+                        user_data['id'], 
+                        selected_plan, 
+                        duration_days
+                    )
                     
-                    if user_data:
-                        # Create subscription
-                        duration_days = 30 if selected_plan != "Enterprise" else 365
-                        user_manager.create_subscription(
-                            user_data['id'], 
-                            selected_plan, 
-                            duration_days
-                        )
-                        
-                        # Set session state
-                        st.session_state.authenticated = True
-                        st.session_state.user_data = user_data
-                        
-                        subscription = user_manager.get_user_subscription(user_data['id'])
-                        st.session_state.subscription = subscription
-                        
-                        st.success(f"Account created successfully! Welcome to PharmQAgentAI, {full_name}!")
-                        st.balloons()
-                        
-                        # Show payment simulation
-                        st.info("🎉 Your subscription is now active! You can start using the platform immediately.")
-                        
-                        st.rerun()
+                    # Set session state
+                    st.session_state.authenticated = True
+                    st.session_state.user_data = user_data
+                    set_session_subscription(subscription)
+                    
+                    st.success(f"Account created successfully! Welcome to PharmQAgentAI, {full_name}!")
+                    st.balloons()
+                    
+                    # Show payment simulation
+                    st.info("🎉 Your subscription is now active! You can start using the platform immediately.")
+                    
+                    st.rerun()
                 else:
                     st.error("Email address already exists. Please use a different email or try logging in.")
 
+def set_session_subscription(subscription: Optional[dict]):
+    """Store the user's subscription and the features its plan is denied"""
+    
+    st.session_state.subscription = subscription
+    plan_type = subscription.get('plan_type') if subscription else None
+    st.session_state.denied_features = SubscriptionPlans.get_denied_features(plan_type)
+
 def render_user_dashboard():
     """Render user dashboard with account info"""
     
-    user_data = st.session_state.get('user_data', {})
-    subscription = st.session_state.get('subscription', {})
+    session = st.session_state
+    user_data = session.get('user_data') or {}
+    subscription = session.get('subscription') or {}
     
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### Account Information")
-    st.sidebar.markdown(f"**Name:** {user_data.get('full_name', 'Unknown')}")
-    st.sidebar.markdown(f"**Email:** {user_data.get('email', 'Unknown')}")
+    account_lines = [
+        f"**Name:** {user_data.get('full_name', 'Unknown')}",
+        f"**Email:** {user_data.get('email', 'Unknown')}"
+    ]
     
     if subscription:
-        plan_type = subscription.get('plan_type', 'No Plan')
-        st.sidebar.markdown(f"**Plan:** {plan_type}")
-        st.sidebar.markdown(f"**Status:** {subscription.get('payment_status', 'Unknown')}")
+        account_lines.append(f"**Plan:** {subscription.get('plan_type', 'No Plan')}")
+        account_lines.append(f"**Status:** {subscription.get('payment_status', 'Unknown')}")
+    
+    st.sidebar.markdown("---\n\n### Account Information\n\n" + "  \n".join(account_lines))
     
     if st.sidebar.button("Logout"):
         # Clear session state
-        for key in ['authenticated', 'user_data', 'subscription']:
-            if key in st.session_state:
-                del st.session_state[key]
+        for key in ['authenticated', 'user_data', 'subscription', 'denied_features']:
+            session.pop(key, None)
         st.rerun()
 
 def check_feature_access(feature: str) -> bool:
     """Check if current user has access to a specific feature"""
     
-    if not st.session_state.get('authenticated', False):
+    session = st.session_state
+    if not session.get('authenticated', False):
         return False
     
-    subscription = st.session_state.get('subscription')
-    if not subscription:
+    if not session.get('subscription'):
         return False
     
-    plan_type = subscription.get('plan_type')
-    return SubscriptionPlans.check_feature_access(plan_type, feature)
+    # None means the plan is unknown, which grants nothing
+    denied_features = session.get('denied_features')
+    return denied_features is not None and feature not in denied_features
 
 def render_access_denied(feature_name: str, required_plan: str):
     """Render access denied message with upgrade option"""
@@ -288,13 +322,5 @@ def render_access_denied(feature_name: str, required_plan: str):
 def init_auth_session():
     """Initialize authentication session state"""
     
-    if 'authenticated' not in st.session_state:
-        st.session_state.authenticated = False
-    if 'user_data' not in st.session_state:
-        st.session_state.user_data = None
-    if 'subscription' not in st.session_state:
-        st.session_state.subscription = None
-    if 'selected_plan' not in st.session_state:
-        st.session_state.selected_plan = 'Professional'
-    if 'show_signup' not in st.session_state:
-        st.session_state.show_signup = False
\ No newline at end of file
+    for key, value in _AUTH_SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
@@ -0,0 +1,71 @@
+"""
+Password hashing for PharmQAgentAI
+Argon2id with a salted scrypt fallback; legacy SHA-256 hashes still verify
+"""
+
+import hashlib
+import hmac
+import secrets
+from functools import lru_cache
+from typing import Optional
+
+# Argon2 is the preferred password hash; scrypt is the stdlib fallback
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+    PasswordHasher = None
+
+SCRYPT_PREFIX = "scrypt$"
+SCRYPT_PARAMS = {"n": 2 ** 14, "r": 8, "p": 1}
+
+# RFC 9106 second recommended option: t=3, 64 MiB, 4 lanes
+_PH = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=4) if ARGON2_AVAILABLE else None
+
+def hash_password(password: str) -> str:
+    """Hash password using Argon2id, or salted scrypt without argon2-cffi"""
+    if _PH:
+        return _PH.hash(password)
+
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, **SCRYPT_PARAMS)
+    return f"{SCRYPT_PREFIX}{salt.hex()}${digest.hex()}"
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Hash of a random password, checked when no user matches"""
+    return hash_password(secrets.token_urlsafe(16))
+
+def verify_password(password_hash: Optional[str], password: str) -> bool:
+    """Check a password against a stored hash in constant time
+
+    A missing hash still costs one verification, so response time does not
+    reveal whether the account exists.
+    """
+    if password_hash is None:
+        verify_password(_dummy_hash(), password)
+        return False
+
+    if password_hash.startswith("$argon2"):
+        if not _PH:
+            return False
+        try:
+            return _PH.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    if password_hash.startswith(SCRYPT_PREFIX):
+        salt_hex, _, digest_hex = password_hash[len(SCRYPT_PREFIX):].partition("$")
+        digest = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt_hex), **SCRYPT_PARAMS)
+        return hmac.compare_digest(digest.hex(), digest_hex)
+
+    # Legacy unsalted SHA-256 hashes, upgraded on the next successful login
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """Check whether a stored hash uses outdated parameters or algorithm"""
+    if _PH:
+        return not password_hash.startswith("$argon2") or _PH.check_needs_rehash(password_hash)
+    return not password_hash.startswith(SCRYPT_PREFIX)
@@ -5,15 +5,74 @@ Handles authentication, subscription plans, and user access control
 """
 
 import streamlit as st
-import hashlib
 import os
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import psycopg2
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
+from auth import passwords
+from auth.rate_limit import check_login_attempt
+
+# Per-process pool; 3 app instances x (10 + 20) stays under Postgres' default max_connections=100
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 20
+POOL_TIMEOUT_SECONDS = 30
+POOL_RECYCLE_SECONDS = 3600
+STATEMENT_TIMEOUT_MS = 5000
+SUBSCRIPTION_CACHE_TTL_SECONDS = 300
+USAGE_FLUSH_BATCH_SIZE = 500
+USAGE_FLUSH_INTERVAL_SECONDS = 0.25
+HEALTH_CHECK_TTL_SECONDS = 30
+
+# Indexes that create_all only adds when it creates the table itself. Tables
+# that predate the unique usage index may hold several rows per user and
+# feature; those are merged into the oldest row before the index is built.
+INDEX_DDL = [
+    """DO $$
+       BEGIN
+           IF to_regclass('pharmq_usage_tracking_user_feature_idx') IS NULL THEN
+               LOCK TABLE pharmq_usage_tracking IN SHARE ROW EXCLUSIVE MODE;
+               WITH totals AS (
+                   SELECT MIN(id) AS keep_id, user_id, feature,
+                          SUM(usage_count) AS usage_count, MAX(last_used) AS last_used
+                   FROM pharmq_usage_tracking
+                   WHERE user_id IS NOT NULL
+                   GROUP BY user_id, feature
+                   HAVING COUNT(*) > 1
+               ), merged AS (
+                   UPDATE pharmq_usage_tracking u
+                   SET usage_count = t.usage_count, last_used = t.last_used
+                   FROM totals t
+                   WHERE u.id = t.keep_id
+               )
+               DELETE FROM pharmq_usage_tracking u
+               USING totals t
+               WHERE u.user_id = t.user_id AND u.feature = t.feature AND u.id <> t.keep_id;
+           END IF;
+       END $$""",
+    """CREATE UNIQUE INDEX IF NOT EXISTS pharmq_usage_tracking_user_feature_idx
+       ON pharmq_usage_tracking (user_id, feature)""",
+    """CREATE INDEX IF NOT EXISTS idx_subs_active_user
+       ON pharmq_subscriptions (user_id, start_date DESC) WHERE is_active = TRUE"""
+]
+
+# Adds a batch's coalesced count for one user and feature
+USAGE_UPSERT = text("""
+    INSERT INTO pharmq_usage_tracking (user_id, feature, usage_count, last_used)
+    VALUES (:user_id, :feature, :count, now())
+    ON CONFLICT (user_id, feature) DO UPDATE
+    SET usage_count = pharmq_usage_tracking.usage_count + EXCLUDED.usage_count,
+        last_used = now()
+""")
 
 Base = declarative_base()
 
@@ -46,6 +105,11 @@ class Subscription(Base):
     
     # Relationship to user
     user = relationship("User", back_populates="subscriptions")
+    
+    # Active subscription lookups and deactivation by user, over live rows only
+    __table_args__ = (
+        Index('idx_subs_active_user', user_id, start_date.desc(), postgresql_where=(is_active == True)),
+    )
 
 class UsageTracking(Base):
     """Usage tracking model for PostgreSQL"""
@@ -56,6 +120,126 @@ class UsageTracking(Base):
     feature = Column(String(100), nullable=False)
     usage_count = Column(Integer, default=1)
     last_used = Column(DateTime, default=func.now())
+    
+    # One row per user and feature, required by the track_usage upsert
+    __table_args__ = (
+        Index('pharmq_usage_tracking_user_feature_idx', 'user_id', 'feature', unique=True),
+    )
+
+@st.cache_resource(show_spinner=False)
+def _get_engine(database_url: str):
+    """Get the process-wide engine for a database URL, discarding stale connections before use"""
+    return create_engine(
+        database_url,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+        pool_recycle=POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args={"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"}
+    )
+
+class _UsageWriter:
+    """Queues usage events and writes them in batches from a background thread"""
+    
+    # Queued by close(); the thread writes what it holds and exits
+    _STOP = object()
+    
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name="pharmq_usage", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def _run(self):
+        """Collect up to a batch of events, or whatever arrives within the flush interval"""
+        while True:
+            events = [self.queue.get()]
+            deadline = time.monotonic() + USAGE_FLUSH_INTERVAL_SECONDS
+            while events[-1] is not self._STOP and len(events) < USAGE_FLUSH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            stopping = events[-1] is self._STOP
+            if stopping:
+                events.pop()
+            if events:
+                try:
+                    self._write(events)
+                except Exception as e:
+                    # A malformed batch must not stop the writer thread
+                    print(f"Error tracking usage: {e}")
+            if stopping:
+                return
+    
+    def close(self, timeout: float = 5.0):
+        """Write out queued and in-flight events, then stop the writer thread"""
+        self.queue.put(self._STOP)
+        self.thread.join(timeout)
+    
+    def _write(self, events: List[Tuple[int, str]]):
+        """Upsert coalesced counts in one transaction, in a stable order to avoid deadlocks
+        
+        If the batch fails, each row is retried on its own so one bad row, such
+        as a user deleted since the event, only loses its own count.
+        """
+        # Ordered by text so a stray None or mixed types still sort
+        rows = [
+            {'user_id': user_id, 'feature': feature, 'count': count}
+            for (user_id, feature), count in sorted(Counter(events).items(),
+                                                    key=lambda item: (str(item[0][0]), str(item[0][1])))
+        ]
+        engine = _get_engine(self.database_url)
+        try:
+            with engine.begin() as conn:
+                conn.execute(USAGE_UPSERT, rows)
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                print(f"Error tracking usage for {rows[0]}: {e}")
+                return
+        
+        for row in rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(USAGE_UPSERT, row)
+            except Exception as e:
+                print(f"Error tracking usage for {row}: {e}")
+
+@st.cache_resource(show_spinner=False)
+def _get_usage_writer(database_url: str) -> _UsageWriter:
+    """Get the process-wide usage writer for a database URL"""
+    return _UsageWriter(database_url)
+
+@st.cache_data(ttl=HEALTH_CHECK_TTL_SECONDS, show_spinner=False)
+def _check_connection(database_url: str) -> bool:
+    """Check out and return a pooled connection; pool_pre_ping validates it on checkout"""
+    try:
+        with _get_engine(database_url).connect():
+            return True
+    except Exception as e:
+        print(f"Database connection test failed: {e}")
+        return False
+
+@st.cache_data(ttl=SUBSCRIPTION_CACHE_TTL_SECONDS, show_spinner=False)
+def _get_subscription(database_url: str, user_id: int) -> Optional[Dict]:
+    """Fetch the active subscription for a user"""
+    with _get_engine(database_url).connect() as conn:
+        subscription = conn.execute(text("""
+            SELECT id, plan_type, start_date, end_date, is_active
+            FROM pharmq_subscriptions
+            WHERE user_id = :user_id AND is_active = TRUE
+            ORDER BY start_date DESC
+            LIMIT 1
+        """), {'user_id': user_id}).first()
+    
+    return dict(subscription._mapping) if subscription else None
 
 class PostgreSQLUserManager:
     """Manages user authentication and subscriptions using PostgreSQL"""
@@ -67,8 +251,8 @@ class PostgreSQLUserManager:
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable must be set")
         
-        # Create SQLAlchemy engine
-        self.engine = create_engine(self.database_url)
+        # Share one engine, and so one connection pool, per process
+        self.engine = _get_engine(self.database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # Create tables if they don't exist
@@ -79,6 +263,9 @@ class PostgreSQLUserManager:
         try:
             # Create all tables
             Base.metadata.create_all(bind=self.engine)
+            with self.engine.begin() as conn:
+                for statement in INDEX_DDL:
+                    conn.execute(text(statement))
             print("✅ PostgreSQL tables created/verified successfully")
         except Exception as e:
             print(f"❌ Error creating database tables: {e}")
@@ -89,33 +276,34 @@ class PostgreSQLUserManager:
         return self.SessionLocal()
     
     def hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password using Argon2id, or salted scrypt without argon2-cffi"""
+        return passwords.hash_password(password)
     
     def register_user(self, email: str, password: str, full_name: str, organization: str = None) -> bool:
         """Register a new user"""
         session = self.get_session()
         try:
-            # Check if user already exists
-            existing_user = session.query(User).filter(User.email == email).first()
-            if existing_user:
-                return False
-            
-            # Create new user
+            # Create new user; an existing email inserts nothing
             password_hash = self.hash_password(password)
-            new_user = User(
-                email=email,
-                password_hash=password_hash,
-                full_name=full_name,
-                organization=organization or ""
-            )
+            new_user_id = session.execute(text("""
+                INSERT INTO pharmq_users (email, password_hash, full_name, organization, created_at, is_active)
+                VALUES (:email, :password_hash, :full_name, :organization, now(), TRUE)
+                ON CONFLICT (email) DO NOTHING
+                RETURNING id
+            """), {
+                'email': email,
+                'password_hash': password_hash,
+                'full_name': full_name,
+                'organization': organization or ""
+            }).scalar()
             
-            session.add(new_user)
-            session.flush()  # Get the ID without committing
+            if new_user_id is None:
+                return False
             
-            # Create default starter subscription
-            self.create_subscription(new_user.id, "Starter", 30)
+            # Create default starter subscription in the same transaction
+            self._create_subscription_unchecked(session, new_user_id, "Starter", 30)
             session.commit()
+            _get_subscription.clear(self.database_url, new_user_id)
             
             return True
             
@@ -128,83 +316,105 @@ class PostgreSQLUserManager:
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
+        user_data, _ = self.login_with_subscription(email, password)
+        return user_data
+    
+    def login_with_subscription(self, email: str, password: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Authenticate user and fetch their active subscription in one query"""
+        check_login_attempt(email)
+        
         session = self.get_session()
         try:
-            password_hash = self.hash_password(password)
-            user = session.query(User).filter(
-                User.email == email,
-                User.password_hash == password_hash,
-                User.is_active == True
-            ).first()
+            row = session.execute(text("""
+                SELECT u.id, u.email, u.full_name, u.organization, u.created_at, u.password_hash,
+                       s.id AS subscription_id, s.plan_type, s.start_date, s.end_date
+                FROM pharmq_users u
+                LEFT JOIN LATERAL (
+                    SELECT id, plan_type, start_date, end_date
+                    FROM pharmq_subscriptions
+                    WHERE user_id = u.id AND is_active = TRUE
+                    ORDER BY start_date DESC
+                    LIMIT 1
+                ) s ON TRUE
+                WHERE u.email = :email AND u.is_active = TRUE
+            """), {'email': email}).first()
+            
+            if not passwords.verify_password(row.password_hash if row else None, password):
+                return None, None
             
-            if user:
-                # Update last login
-                user.last_login = datetime.now()
-                session.commit()
-                
-                return {
-                    'id': user.id,
-                    'email': user.email,
-                    'full_name': user.full_name,
-                    'organization': user.organization,
-                    'created_at': user.created_at,
-                    'last_login': user.last_login
+            # Update last login, upgrading the stored hash if needed
+            password_hash = row.password_hash
+            if passwords.password_needs_rehash(password_hash):
+                password_hash = self.hash_password(password)
+            last_login = session.execute(text("""
+                UPDATE pharmq_users SET last_login = now(), password_hash = :password_hash
+                WHERE id = :id
+                RETURNING last_login
+            """), {'password_hash': password_hash, 'id': row.id}).scalar()
+            session.commit()
+            
+            user_data = {
+                'id': row.id,
+                'email': row.email,
+                'full_name': row.full_name,
+                'organization': row.organization,
+                'created_at': row.created_at,
+                'last_login': last_login
+            }
+            
+            subscription = None
+            if row.subscription_id is not None:
+                subscription = {
+                    'id': row.subscription_id,
+                    'plan_type': row.plan_type,
+                    'start_date': row.start_date,
+                    'end_date': row.end_date,
+                    'is_active': True
                 }
             
-            return None
+            return user_data, subscription
             
         except Exception as e:
+            session.rollback()
             print(f"Error authenticating user: {e}")
-            return None
+            return None, None
         finally:
             session.close()
     
     def get_user_subscription(self, user_id: int) -> Optional[Dict]:
-        """Get active subscription for user"""
-        session = self.get_session()
+        """Get active subscription for user, cached briefly across reruns"""
         try:
-            subscription = session.query(Subscription).filter(
-                Subscription.user_id == user_id,
-                Subscription.is_active == True
-            ).order_by(Subscription.start_date.desc()).first()
-            
-            if subscription:
-                return {
-                    'id': subscription.id,
-                    'plan_type': subscription.plan_type,
-                    'start_date': subscription.start_date,
-                    'end_date': subscription.end_date,
-                    'is_active': subscription.is_active
-                }
-            
-            return None
-            
+            return _get_subscription(self.database_url, user_id)
         except Exception as e:
             print(f"Error getting user subscription: {e}")
             return None
-        finally:
-            session.close()
+    
+    def _create_subscription_unchecked(self, session, user_id: int, plan_type: str, duration_days: int = 30):
+        """Add a subscription without deactivating existing ones, for users known to have none"""
+        end_date = datetime.now() + timedelta(days=duration_days)
+        session.add(Subscription(
+            user_id=user_id,
+            plan_type=plan_type,
+            end_date=end_date
+        ))
     
     def create_subscription(self, user_id: int, plan_type: str, duration_days: int = 30) -> bool:
-        """Create new subscription for user"""
+        """Create new subscription for user, replacing any active one"""
         session = self.get_session()
         try:
-            # Deactivate existing subscriptions
-            session.query(Subscription).filter(
-                Subscription.user_id == user_id,
-                Subscription.is_active == True
-            ).update({'is_active': False})
-            
-            # Create new subscription
+            # Deactivate existing subscriptions and create the new one in a single statement
             end_date = datetime.now() + timedelta(days=duration_days)
-            new_subscription = Subscription(
-                user_id=user_id,
-                plan_type=plan_type,
-                end_date=end_date
-            )
+            session.execute(text("""
+                WITH deactivated AS (
+                    UPDATE pharmq_subscriptions SET is_active = FALSE
+                    WHERE user_id = :user_id AND is_active = TRUE
+                )
+                INSERT INTO pharmq_subscriptions (user_id, plan_type, start_date, end_date, is_active)
+                VALUES (:user_id, :plan_type, now(), :end_date, TRUE)
+            """), {'user_id': user_id, 'plan_type': plan_type, 'end_date': end_date})
             
-            session.add(new_subscription)
             session.commit()
+            _get_subscription.clear(self.database_url, user_id)
             return True
             
         except Exception as e:
@@ -215,80 +425,41 @@ class PostgreSQLUserManager:
             session.close()
     
     def track_usage(self, user_id: int, feature: str):
-        """Track feature usage for analytics"""
-        session = self.get_session()
-        try:
-            # Check if usage record exists
-            usage = session.query(UsageTracking).filter(
-                UsageTracking.user_id == user_id,
-                UsageTracking.feature == feature
-            ).first()
-            
-            if usage:
-                usage.usage_count += 1
-                usage.last_used = datetime.now()
-            else:
-                usage = UsageTracking(
-                    user_id=user_id,
-                    feature=feature,
-                    usage_count=1
-                )
-                session.add(usage)
-            
-            session.commit()
-            
-        except Exception as e:
-            session.rollback()
-            print(f"Error tracking usage: {e}")
-        finally:
-            session.close()
+        """Track feature usage for analytics without blocking the caller"""
+        _get_usage_writer(self.database_url).queue.put((user_id, feature))
     
     def get_usage_stats(self, user_id: int) -> Dict:
-        """Get usage statistics for user"""
-        session = self.get_session()
+        """Get usage statistics for user, aggregated by the database"""
         try:
-            usage_records = session.query(UsageTracking).filter(
-                UsageTracking.user_id == user_id
-            ).all()
+            with self.engine.connect() as conn:
+                record = conn.execute(text("""
+                    SELECT COALESCE(SUM(usage_count), 0) AS total_predictions,
+                           MAX(last_used) AS last_activity,
+                           COALESCE(jsonb_object_agg(feature, usage_count) FILTER (WHERE feature IS NOT NULL),
+                                    '{}'::jsonb) AS features_used
+                    FROM pharmq_usage_tracking
+                    WHERE user_id = :user_id
+                """), {'user_id': user_id}).one()
             
-            stats = {
-                'total_predictions': 0,
-                'features_used': {},
-                'last_activity': None
+            return {
+                'total_predictions': record.total_predictions,
+                'features_used': record.features_used,
+                'last_activity': record.last_activity
             }
             
-            for record in usage_records:
-                stats['features_used'][record.feature] = record.usage_count
-                stats['total_predictions'] += record.usage_count
-                
-                if stats['last_activity'] is None or record.last_used > stats['last_activity']:
-                    stats['last_activity'] = record.last_used
-            
-            return stats
-            
         except Exception as e:
             print(f"Error getting usage stats: {e}")
             return {'total_predictions': 0, 'features_used': {}, 'last_activity': None}
-        finally:
-            session.close()
     
     def test_connection(self) -> bool:
-        """Test database connection"""
-        try:
-            session = self.get_session()
-            # Simple query to test connection
-            from sqlalchemy import text
-            session.execute(text("SELECT 1"))
-            session.close()
-            return True
-        except Exception as e:
-            print(f"Database connection test failed: {e}")
-            return False
+        """Test database connection, probing at most once per HEALTH_CHECK_TTL_SECONDS"""
+        return _check_connection(self.database_url)
 
 class SubscriptionPlans:
     """Defines subscription plans and their features"""
     
-    PLANS = {
+    # Read-only so callers can share plan details without copying them
+    PLANS = MappingProxyType({
         "Starter": {
             "price": "$49/month",
             "description": "Perfect for academic researchers and small biotech teams",
@@ -342,7 +513,16 @@ class SubscriptionPlans:
                 "data_storage_gb": 100
             }
         }
-    }
+    })
+    
+    # Features restricted to particular plans; anything else is open to every plan
+    FEATURE_REQUIREMENTS = MappingProxyType({
+        "advanced_agents": frozenset({"Professional", "Enterprise"}),
+        "api_access": frozenset({"Professional", "Enterprise"}),
+        "unlimited_predictions": frozenset({"Enterprise"}),
+        "custom_reporting": frozenset({"Professional", "Enterprise"}),
+        "multi_user": frozenset({"Enterprise"})
+    })
     
     @classmethod
     def get_plan_features(cls, plan_type: str) -> Dict:
@@ -352,15 +532,5 @@ class SubscriptionPlans:
     @classmethod
     def check_feature_access(cls, user_plan: str, feature: str) -> bool:
         """Check if user's plan allows access to specific feature"""
-        plan = cls.PLANS.get(user_plan, cls.PLANS["Starter"])
-        
-        # Define feature access mapping
-        feature_access = {
-            "advanced_agents": user_plan in ["Professional", "Enterprise"],
-            "api_access": user_plan in ["Professional", "Enterprise"],
-            "unlimited_predictions": user_plan == "Enterprise",
-            "custom_reporting": user_plan in ["Professional", "Enterprise"],
-            "multi_user": user_plan == "Enterprise"
-        }
-        
-        return feature_access.get(feature, True)  # Default to True for basic features
\ No newline at end of file
+        required_plans = cls.FEATURE_REQUIREMENTS.get(feature)
+        return required_plans is None or user_plan in required_plans
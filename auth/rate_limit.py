@@ -0,0 +1,76 @@
+"""
+Login Rate Limiting for PharmQAgentAI
+Bounds authentication attempts per client address before any database work
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+
+LOGIN_ATTEMPTS_PER_WINDOW = 20
+CLIENT_ATTEMPTS_PER_WINDOW = 50
+LOGIN_WINDOW_SECONDS = 60
+MAX_TRACKED_KEYS = 10000
+
+class LoginRateLimited(Exception):
+    """Raised when a client has made too many login attempts"""
+
+class RateLimiter:
+    """Fixed-window attempt counter per key, shared by the threads of one process"""
+    
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._windows: Dict[Tuple, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+    
+    def allow(self, key: Tuple) -> bool:
+        """Count an attempt for key and report whether it is within the limit"""
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._windows.get(key, (now, 0))
+            if now - start >= self.window_seconds:
+                start, count = now, 0
+            self._windows[key] = (start, count + 1)
+            
+            if len(self._windows) > MAX_TRACKED_KEYS:
+                self._prune(now)
+            
+            return count < self.limit
+    
+    def _prune(self, now: float):
+        """Forget keys whose window has expired"""
+        self._windows = {
+            key: window for key, window in self._windows.items()
+            if now - window[0] < self.window_seconds
+        }
+
+login_limiter = RateLimiter(LOGIN_ATTEMPTS_PER_WINDOW, LOGIN_WINDOW_SECONDS)
+client_limiter = RateLimiter(CLIENT_ATTEMPTS_PER_WINDOW, LOGIN_WINDOW_SECONDS)
+
+def _client_ip() -> Optional[str]:
+    """Address of the browser session making the request, if known"""
+    try:
+        return st.context.ip_address
+    except Exception:
+        return None  # Outside a Streamlit session, e.g. setup scripts
+
+def allow_login_attempt(email: str) -> bool:
+    """Count a login attempt from the current client for an email address
+
+    Attempts are limited per (client, email) pair, so one client cannot lock
+    another out of their account, and per client, so spraying a password
+    across many accounts is bounded too. Streamlit reports no address for
+    localhost sessions; those share one bucket and skip the per-client cap.
+    """
+    ip = _client_ip()
+    if ip and not client_limiter.allow((ip,)):
+        return False
+    return login_limiter.allow((ip, email.strip().lower()))
+
+def check_login_attempt(email: str):
+    """Raise LoginRateLimited when the current client is over its login limit"""
+    if not allow_login_attempt(email):
+        raise LoginRateLimited("Too many login attempts. Please wait a minute and try again.")
@@ -4,145 +4,249 @@ Handles authentication, subscription plans, and user access control
 """
 
 import streamlit as st
-import hashlib
 import json
 import os
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Dict, FrozenSet, Optional, List, Tuple
 import sqlite3
+import threading
+from contextlib import contextmanager
+from auth import passwords
+from auth.rate_limit import check_login_attempt
+
+# Applied once to the shared connection: WAL lets reads proceed during writes
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -20000;
+"""
+
+class _SharedConnection:
+    """A process-wide SQLite connection and the lock serializing its use"""
+    
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.executescript(SQLITE_PRAGMAS)
+        self.lock = threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def _get_connection(db_path: str) -> _SharedConnection:
+    """Get the process-wide connection for a database file"""
+    return _SharedConnection(db_path)
 
 class UserManager:
     """Manages user authentication and subscriptions"""
     
+    # Database files whose schema has already been created in this process
+    _initialized_databases = set()
+    
     def __init__(self):
         self.db_path = "auth/users.db"
         self.init_database()
     
+    @contextmanager
+    def _connect(self):
+        """Use the shared connection, one thread at a time"""
+        shared = _get_connection(self.db_path)
+        with shared.lock:
+            yield shared.conn
+    
     def init_database(self):
         """Initialize SQLite database for user management"""
-        os.makedirs("auth", exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                organization TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE
-            )
-        ''')
+        if self.db_path in UserManager._initialized_databases:
+            return
         
-        # Subscriptions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subscriptions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                plan_type TEXT NOT NULL,
-                start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                end_date TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                payment_status TEXT DEFAULT 'pending',
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Usage tracking table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usage_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                feature_used TEXT,
-                usage_count INTEGER DEFAULT 1,
-                usage_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            
+            # Users table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    email TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    full_name TEXT NOT NULL,
+                    organization TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP,
+                    is_active BOOLEAN DEFAULT TRUE
+                )
+            ''')
+            
+            # Subscriptions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    plan_type TEXT NOT NULL,
+                    start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    end_date TIMESTAMP,
+                    is_active BOOLEAN DEFAULT TRUE,
+                    payment_status TEXT DEFAULT 'pending',
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+            
+            # Usage tracking table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS usage_tracking (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    feature_used TEXT,
+                    usage_count INTEGER DEFAULT 1,
+                    usage_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- last use
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+            
+            # Active subscription lookups by user, over live rows only
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_subscriptions_active_user
+                ON subscriptions (user_id, start_date DESC) WHERE is_active = TRUE
+            ''')
+            
+            # One usage row per user and feature, required by the track_usage upsert
+            has_usage_index = cursor.execute('''
+                SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_usage_tracking_user_feature'
+            ''').fetchone()
+            
+            if not has_usage_index:
+                # Fold the per-event rows of older databases into one row per feature
+                cursor.executescript('''
+                    BEGIN;
+                    UPDATE usage_tracking SET
+                        usage_count = (SELECT SUM(usage_count) FROM usage_tracking t
+                                       WHERE t.user_id IS usage_tracking.user_id
+                                       AND t.feature_used IS usage_tracking.feature_used),
+                        usage_date = (SELECT MAX(usage_date) FROM usage_tracking t
+                                      WHERE t.user_id IS usage_tracking.user_id
+                                      AND t.feature_used IS usage_tracking.feature_used)
+                    WHERE id IN (SELECT MAX(id) FROM usage_tracking GROUP BY user_id, feature_used);
+                    DELETE FROM usage_tracking
+                    WHERE id NOT IN (SELECT MAX(id) FROM usage_tracking GROUP BY user_id, feature_used);
+                    DROP INDEX IF EXISTS idx_usage_tracking_user_feature;
+                    CREATE UNIQUE INDEX uq_usage_tracking_user_feature
+                    ON usage_tracking (user_id, feature_used);
+                    COMMIT;
+                ''')
         
-        conn.commit()
-        conn.close()
+        UserManager._initialized_databases.add(self.db_path)
     
     def hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password using Argon2id, or salted scrypt without argon2-cffi"""
+        return passwords.hash_password(password)
     
     def register_user(self, email: str, password: str, full_name: str, organization: str = None) -> bool:
         """Register a new user"""
+        password_hash = self.hash_password(password)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            password_hash = self.hash_password(password)
-            
-            cursor.execute('''
-                INSERT INTO users (email, password_hash, full_name, organization)
-                VALUES (?, ?, ?, ?)
-            ''', (email, password_hash, full_name, organization))
-            
-            conn.commit()
-            conn.close()
+            with self._connect() as conn:
+                conn.execute('''
+                    INSERT INTO users (email, password_hash, full_name, organization)
+                    VALUES (?, ?, ?, ?)
+                ''', (email, password_hash, full_name, organization))
             return True
         except sqlite3.IntegrityError:
             return False  # Email already exists
     
+    def register_and_login(self, email: str, password: str, full_name: str, organization: str = None) -> Optional[Dict]:
+        """Register a new user and return their user data, or None if the email exists"""
+        password_hash = self.hash_password(password)
+        
+        try:
+            with self._connect() as conn:
+                user_id, created_at = conn.execute('''
+                    INSERT INTO users (email, password_hash, full_name, organization, last_login)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    RETURNING id, created_at
+                ''', (email, password_hash, full_name, organization)).fetchone()
+            
+            return {
+                'id': user_id,
+                'email': email,
+                'full_name': full_name,
+                'organization': organization,
+                'created_at': created_at
+            }
+        except sqlite3.IntegrityError:
+            return None  # Email already exists
+    
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        user_data, _ = self.login_with_subscription(email, password)
+        return user_data
+    
+    def login_with_subscription(self, email: str, password: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Authenticate user and fetch their active subscription in one query"""
+        check_login_attempt(email)
         
-        password_hash = self.hash_password(password)
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT u.id, u.email, u.full_name, u.organization, u.created_at,
+                       s.plan_type, s.start_date, s.end_date, s.payment_status,
+                       u.password_hash
+                FROM users u
+                LEFT JOIN subscriptions s ON s.id = (
+                    SELECT id FROM subscriptions
+                    WHERE user_id = u.id AND is_active = TRUE
+                    ORDER BY start_date DESC
+                    LIMIT 1
+                )
+                WHERE u.email = ? AND u.is_active = TRUE
+            ''', (email,)).fetchone()
         
-        cursor.execute('''
-            SELECT id, email, full_name, organization, created_at
-            FROM users 
-            WHERE email = ? AND password_hash = ? AND is_active = TRUE
-        ''', (email, password_hash))
+        # Verify outside the lock so a slow hash does not block other queries
+        if not passwords.verify_password(row[9] if row else None, password):
+            return None, None
         
-        user = cursor.fetchone()
+        # Update last login, upgrading the stored hash if needed
+        if passwords.password_needs_rehash(row[9]):
+            password_hash = self.hash_password(password)
+            with self._connect() as conn:
+                conn.execute('''
+                    UPDATE users SET last_login = CURRENT_TIMESTAMP, password_hash = ?
+                    WHERE id = ?
+                ''', (password_hash, row[0]))
+        else:
+            with self._connect() as conn:
+                conn.execute('''
+                    UPDATE users SET last_login = CURRENT_TIMESTAMP 
+                    WHERE id = ?
+                ''', (row[0],))
         
-        if user:
-            # Update last login
-            cursor.execute('''
-                UPDATE users SET last_login = CURRENT_TIMESTAMP 
-                WHERE id = ?
-            ''', (user[0],))
-            conn.commit()
-            
-            user_data = {
-                'id': user[0],
-                'email': user[1],
-                'full_name': user[2],
-                'organization': user[3],
-                'created_at': user[4]
+        user_data = {
+            'id': row[0],
+            'email': row[1],
+            'full_name': row[2],
+            'organization': row[3],
+            'created_at': row[4]
+        }
+        
+        subscription = None
+        if row[5] is not None:
+            subscription = {
+                'plan_type': row[5],
+                'start_date': row[6],
+                'end_date': row[7],
+                'payment_status': row[8]
             }
-            
-            conn.close()
-            return user_data
         
-        conn.close()
-        return None
+        return user_data, subscription
     
     def get_user_subscription(self, user_id: int) -> Optional[Dict]:
         """Get active subscription for user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT plan_type, start_date, end_date, payment_status
-            FROM subscriptions 
-            WHERE user_id = ? AND is_active = TRUE
-            ORDER BY start_date DESC
-            LIMIT 1
-        ''', (user_id,))
-        
-        subscription = cursor.fetchone()
-        conn.close()
+        with self._connect() as conn:
+            subscription = conn.execute('''
+                SELECT plan_type, start_date, end_date, payment_status
+                FROM subscriptions 
+                WHERE user_id = ? AND is_active = TRUE
+                ORDER BY start_date DESC
+                LIMIT 1
+            ''', (user_id,)).fetchone()
         
         if subscription:
             return {
@@ -155,56 +259,54 @@ class UserManager:
     
     def create_subscription(self, user_id: int, plan_type: str, duration_days: int = 30) -> bool:
         """Create new subscription for user"""
+        return self.subscribe(user_id, plan_type, duration_days) is not None
+    
+    def subscribe(self, user_id: int, plan_type: str, duration_days: int = 30) -> Optional[Dict]:
+        """Create new subscription for user and return it"""
+        end_date = datetime.now() + timedelta(days=duration_days)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            end_date = datetime.now() + timedelta(days=duration_days)
-            
-            cursor.execute('''
-                INSERT INTO subscriptions (user_id, plan_type, end_date, payment_status)
-                VALUES (?, ?, ?, 'active')
-            ''', (user_id, plan_type, end_date))
+            with self._connect() as conn:
+                subscription = conn.execute('''
+                    INSERT INTO subscriptions (user_id, plan_type, end_date, payment_status)
+                    VALUES (?, ?, ?, 'active')
+                    RETURNING plan_type, start_date, end_date, payment_status
+                ''', (user_id, plan_type, end_date)).fetchone()
             
-            conn.commit()
-            conn.close()
-            return True
-        except:
-            return False
+            return {
+                'plan_type': subscription[0],
+                'start_date': subscription[1],
+                'end_date': subscription[2],
+                'payment_status': subscription[3]
+            }
+        except sqlite3.Error:
+            return None
     
     def track_usage(self, user_id: int, feature: str):
         """Track feature usage for analytics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO usage_tracking (user_id, feature_used)
-            VALUES (?, ?)
-        ''', (user_id, feature))
-        
-        conn.commit()
-        conn.close()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO usage_tracking (user_id, feature_used)
+                VALUES (?, ?)
+                ON CONFLICT (user_id, feature_used) DO UPDATE
+                SET usage_count = usage_count + 1,
+                    usage_date = CURRENT_TIMESTAMP
+            ''', (user_id, feature))
     
     def get_usage_stats(self, user_id: int) -> Dict:
         """Get usage statistics for user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT feature_used, COUNT(*) as count
-            FROM usage_tracking 
-            WHERE user_id = ? 
-            GROUP BY feature_used
-        ''', (user_id,))
-        
-        stats = dict(cursor.fetchall())
-        conn.close()
-        return stats
+        with self._connect() as conn:
+            return dict(conn.execute('''
+                SELECT feature_used, usage_count
+                FROM usage_tracking 
+                WHERE user_id = ?
+            ''', (user_id,)).fetchall())
 
 class SubscriptionPlans:
     """Defines subscription plans and their features"""
     
-    PLANS = {
+    # Read-only so callers can share plan details without copying them
+    PLANS = MappingProxyType({
         "Starter": {
             "price": "$49/month",
             "description": "Perfect for academic researchers and small biotech teams",
@@ -258,7 +360,16 @@ class SubscriptionPlans:
                 "data_storage_gb": 100
             }
         }
-    }
+    })
+    
+    # Features restricted to particular plans; anything else is open to every plan
+    FEATURE_REQUIREMENTS = MappingProxyType({
+        "ai_agents": frozenset({"Professional", "Enterprise"}),
+        "advanced_analytics": frozenset({"Professional", "Enterprise"}),
+        "molecular_optimization": frozenset({"Professional", "Enterprise"}),
+        "collaboration": frozenset({"Enterprise"}),
+        "api_access": frozenset({"Professional", "Enterprise"})
+    })
     
     @classmethod
     def get_plan_features(cls, plan_type: str) -> Dict:
@@ -271,16 +382,16 @@ class SubscriptionPlans:
         if not user_plan or user_plan not in cls.PLANS:
             return False
         
-        plan_limits = cls.PLANS[user_plan].get("limits", {})
-        
-        # Define feature requirements
-        feature_requirements = {
-            "ai_agents": ["Professional", "Enterprise"],
-            "advanced_analytics": ["Professional", "Enterprise"],
-            "molecular_optimization": ["Professional", "Enterprise"],
-            "collaboration": ["Enterprise"],
-            "api_access": ["Professional", "Enterprise"]
-        }
+        required_plans = cls.FEATURE_REQUIREMENTS.get(feature)
+        return required_plans is None or user_plan in required_plans
+    
+    @classmethod
+    def get_denied_features(cls, user_plan: str) -> Optional[FrozenSet[str]]:
+        """Get the restricted features a plan lacks, or None if the plan is unknown"""
+        if not user_plan or user_plan not in cls.PLANS:
+            return None
         
-        required_plans = feature_requirements.get(feature, ["Starter", "Professional", "Enterprise"])
-        return user_plan in required_plans
\ No newline at end of file
+        return frozenset(
+            feature for feature, plans in cls.FEATURE_REQUIREMENTS.items()
+            if user_plan not in plans
+        )
@@ -4,17 +4,97 @@ Advanced multi-agent system using Google's official Agent Development Kit
 """
 
 import os
+import json
 import logging
-from typing import Dict, Any, List, Optional, AsyncGenerator
+import textwrap
+import time
+from typing import Dict, Any, List, Optional, AsyncGenerator, Tuple
 import asyncio
 from datetime import datetime
+from functools import cached_property, lru_cache
 
 # Google AI imports for enhanced agent capabilities
 import google.genai as genai
+import httpx
 from google.cloud import aiplatform
 
+# HTTP/2 lets concurrent agent calls share one connection; httpx needs h2 for it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Connection pool of the shared Gemini client
+GENAI_MAX_CONNECTIONS = 64
+GENAI_MAX_KEEPALIVE_CONNECTIONS = 32
+
+# Agent calls in flight at once per event loop; more would only wait on the connection pool
+AGENT_MAX_CONCURRENT_CALLS = GENAI_MAX_CONNECTIONS
+
+# Gemini batch jobs trade minutes of latency for discounted pricing
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_TERMINAL_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Second and formatted timestamp last returned by _iso_now
+_TIMESTAMP_CACHE = [0, ""]
+
+def _iso_now() -> str:
+    """Current local time as ISO 8601, formatted at most once per second"""
+    second = int(time.time())
+    if _TIMESTAMP_CACHE[0] != second:
+        _TIMESTAMP_CACHE[:] = [second, datetime.fromtimestamp(second).isoformat()]
+    return _TIMESTAMP_CACHE[1]
+
+@lru_cache(maxsize=1)
+def _get_genai_client() -> genai.Client:
+    """Get the shared Gemini API client, keeping connections alive across agent calls"""
+    return genai.Client(
+        api_key=os.getenv('GOOGLE_AI_API_KEY'),
+        http_options={
+            "async_client_args": {
+                "http2": HTTP2_AVAILABLE,
+                "limits": httpx.Limits(
+                    max_connections=GENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GENAI_MAX_KEEPALIVE_CONNECTIONS
+                )
+            }
+        }
+    )
+
+def _prompt_text(query: str, parameters: Dict[str, Any]) -> str:
+    """Render an agent query and its parameters as a single prompt"""
+    return f"{query}\n\nContext:\n{json.dumps(parameters, default=str)}"
+
+def _batch_request(system_instruction: str, query: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an inline batch request for one agent prompt"""
+    return {
+        "contents": [{
+            "role": "user",
+            "parts": [{"text": _prompt_text(query, parameters)}]
+        }],
+        "config": {"system_instruction": system_instruction}
+    }
+
+async def _submit_batch(model: str, requests: List[Dict[str, Any]]) -> List[Any]:
+    """Run inline requests as a Gemini batch job; returns response texts, or exceptions, in order"""
+    client = _get_genai_client()
+    job = await client.aio.batches.create(model=model, src=requests)
+    
+    while job.state.name not in BATCH_TERMINAL_STATES:
+        await asyncio.sleep(BATCH_POLL_INTERVAL_SECONDS)
+        job = await client.aio.batches.get(name=job.name)
+    
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch job {job.name} ended in state {job.state.name}")
+    
+    return [
+        item.response.text if item.response else RuntimeError(str(item.error))
+        for item in job.dest.inlined_responses
+    ]
+
 class DrugDiscoveryTool:
     """Custom tool for drug discovery analysis"""
     
@@ -33,7 +113,7 @@ class DrugDiscoveryTool:
             "analysis_type": "pharmaceutical_research",
             "compound_properties": compound_data,
             "predictions": prediction_results,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _iso_now()
         }
 
 class MolecularAnalysisTool(Tool):
@@ -54,24 +134,15 @@ class MolecularAnalysisTool(Tool):
             "smiles_structure": smiles,
             "analysis_performed": analysis_type,
             "molecular_insights": "Structure-activity relationship analysis completed",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _iso_now()
         }
 
 class PharmaceuticalResearchAgent(Agent):
     """Specialized agent for pharmaceutical research using Google ADK"""
     
-    def __init__(self):
-        # Initialize with Google ADK agent capabilities
-        super().__init__(
-            name="pharmaceutical_researcher",
-            description="Expert pharmaceutical research agent with literature analysis capabilities",
-            engine=GenerativeEngine(model="gemini-1.5-pro"),
-            memory=ConversationMemory(),
-            tools=[DrugDiscoveryTool()]
-        )
-        
-        # Set agent personality and expertise
-        self.system_instruction = """
+    MODEL = "gemini-1.5-pro"
+    # Dedented once per class so each request carries no indentation tokens
+    SYSTEM_INSTRUCTION = textwrap.dedent("""
         You are a Pharmaceutical Research Agent specializing in drug discovery and development.
         
         EXPERTISE:
@@ -89,7 +160,20 @@ class PharmaceuticalResearchAgent(Agent):
         - Safety signal detection
         
         Always provide evidence-based responses with scientific rigor and regulatory awareness.
-        """
+    """).strip()
+    
+    def __init__(self):
+        # Initialize with Google ADK agent capabilities
+        super().__init__(
+            name="pharmaceutical_researcher",
+            description="Expert pharmaceutical research agent with literature analysis capabilities",
+            engine=GenerativeEngine(model=self.MODEL, client=_get_genai_client()),
+            memory=ConversationMemory(),
+            tools=[DrugDiscoveryTool()]
+        )
+        
+        # Set agent personality and expertise
+        self.system_instruction = self.SYSTEM_INSTRUCTION
     
     async def process_research_query(self, query: str, context: Dict[str, Any]) -> AgentResponse:
         """Process pharmaceutical research queries"""
@@ -101,20 +185,24 @@ class PharmaceuticalResearchAgent(Agent):
         
         response = await self.generate_response(agent_context)
         return response
+    
+    async def stream_research_query(self, query: str, context: Dict[str, Any]) -> AsyncGenerator[str, None]:
+        """Process pharmaceutical research queries, yielding text as it is generated"""
+        stream = await _get_genai_client().aio.models.generate_content_stream(
+            model=self.MODEL,
+            contents=_prompt_text(query, context),
+            config={"system_instruction": self.system_instruction}
+        )
+        
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
 
 class MolecularAnalysisAgent(Agent):
     """Specialized agent for molecular analysis using Google ADK"""
     
-    def __init__(self):
-        super().__init__(
-            name="molecular_analyst",
-            description="Expert molecular analysis agent with ADMET and structure-activity expertise",
-            engine=GenerativeEngine(model="gemini-1.5-flash"),
-            memory=ConversationMemory(),
-            tools=[MolecularAnalysisTool()]
-        )
-        
-        self.system_instruction = """
+    MODEL = "gemini-1.5-flash"
+    SYSTEM_INSTRUCTION = textwrap.dedent("""
         You are a Molecular Analysis Agent specializing in computational chemistry and drug design.
         
         EXPERTISE:
@@ -132,17 +220,33 @@ class MolecularAnalysisAgent(Agent):
         - Toxicity risk assessment
         
         Provide quantitative analysis with actionable medicinal chemistry insights.
-        """
+    """).strip()
+    
+    def __init__(self):
+        super().__init__(
+            name="molecular_analyst",
+            description="Expert molecular analysis agent with ADMET and structure-activity expertise",
+            engine=GenerativeEngine(model=self.MODEL, client=_get_genai_client()),
+            memory=ConversationMemory(),
+            tools=[MolecularAnalysisTool()]
+        )
+        
+        self.system_instruction = self.SYSTEM_INSTRUCTION
+    
+    def compound_request(self, smiles: str, prediction_data: Dict) -> Tuple[str, Dict[str, Any]]:
+        """Build the query and parameters for a compound analysis"""
+        return f"Analyze compound with SMILES: {smiles}", {
+            "smiles": smiles,
+            "prediction_data": prediction_data,
+            "analysis_type": "comprehensive"
+        }
     
     async def analyze_compound(self, smiles: str, prediction_data: Dict) -> AgentResponse:
         """Analyze molecular compounds"""
+        query, parameters = self.compound_request(smiles, prediction_data)
         agent_context = AgentContext(
-            query=f"Analyze compound with SMILES: {smiles}",
-            parameters={
-                "smiles": smiles,
-                "prediction_data": prediction_data,
-                "analysis_type": "comprehensive"
-            },
+            query=query,
+            parameters=parameters,
             system_instruction=self.system_instruction
         )
         
@@ -152,16 +256,8 @@ class MolecularAnalysisAgent(Agent):
 class ClinicalValidationAgent(Agent):
     """Specialized agent for clinical validation using Google ADK"""
     
-    def __init__(self):
-        super().__init__(
-            name="clinical_validator",
-            description="Expert clinical validation agent with regulatory and safety expertise",
-            engine=GenerativeEngine(model="gemini-1.5-pro"),
-            memory=ConversationMemory(),
-            tools=[]
-        )
-        
-        self.system_instruction = """
+    MODEL = "gemini-1.5-pro"
+    SYSTEM_INSTRUCTION = textwrap.dedent("""
         You are a Clinical Validation Agent specializing in drug safety and regulatory compliance.
         
         EXPERTISE:
@@ -179,16 +275,32 @@ class ClinicalValidationAgent(Agent):
         - Contraindication identification
         
         Focus on patient safety, regulatory compliance, and clinical evidence evaluation.
-        """
+    """).strip()
+    
+    def __init__(self):
+        super().__init__(
+            name="clinical_validator",
+            description="Expert clinical validation agent with regulatory and safety expertise",
+            engine=GenerativeEngine(model=self.MODEL, client=_get_genai_client()),
+            memory=ConversationMemory(),
+            tools=[]
+        )
+        
+        self.system_instruction = self.SYSTEM_INSTRUCTION
+    
+    def validation_request(self, compound_data: Dict, safety_profile: Dict) -> Tuple[str, Dict[str, Any]]:
+        """Build the query and parameters for a clinical validation"""
+        return "Perform clinical validation and safety assessment", {
+            "compound_data": compound_data,
+            "safety_profile": safety_profile
+        }
     
     async def validate_clinical_data(self, compound_data: Dict, safety_profile: Dict) -> AgentResponse:
         """Validate clinical and safety data"""
+        query, parameters = self.validation_request(compound_data, safety_profile)
         agent_context = AgentContext(
-            query="Perform clinical validation and safety assessment",
-            parameters={
-                "compound_data": compound_data,
-                "safety_profile": safety_profile
-            },
+            query=query,
+            parameters=parameters,
             system_instruction=self.system_instruction
         )
         
@@ -199,40 +311,68 @@ class ADKAgentSystem:
     """Google ADK-based multi-agent system for PharmQAgentAI"""
     
     def __init__(self):
-        """Initialize the ADK agent system"""
+        """Initialize the ADK agent system; agents are built on first use"""
+        self.is_initialized = True
+        
+        # Created on first use, inside the event loop that serves the requests
+        self._call_limit: Optional[asyncio.Semaphore] = None
+        self._call_limit_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _build(self, factory):
+        """Construct a component, marking the system unavailable if that fails"""
         try:
-            # Initialize specialized agents
-            self.research_agent = PharmaceuticalResearchAgent()
-            self.analysis_agent = MolecularAnalysisAgent()
-            self.validation_agent = ClinicalValidationAgent()
-            
-            # Initialize multi-agent orchestrator
-            self.orchestrator = MultiAgentOrchestrator(
-                agents=[
-                    self.research_agent,
-                    self.analysis_agent,
-                    self.validation_agent
-                ]
-            )
-            
-            self.is_initialized = True
-            logger.info("Google ADK agent system initialized successfully")
-            
+            return factory()
         except Exception as e:
             logger.error(f"Failed to initialize ADK agent system: {e}")
             self.is_initialized = False
+            raise
+    
+    @cached_property
+    def research_agent(self) -> PharmaceuticalResearchAgent:
+        """Pharmaceutical research agent"""
+        return self._build(PharmaceuticalResearchAgent)
+    
+    @cached_property
+    def analysis_agent(self) -> MolecularAnalysisAgent:
+        """Molecular analysis agent"""
+        return self._build(MolecularAnalysisAgent)
+    
+    @cached_property
+    def validation_agent(self) -> ClinicalValidationAgent:
+        """Clinical validation agent"""
+        return self._build(ClinicalValidationAgent)
     
     def is_available(self) -> bool:
         """Check if ADK agent system is available"""
         return self.is_initialized and bool(os.getenv('GOOGLE_AI_API_KEY'))
     
+    async def _submit(self, kind: str, *args) -> Any:
+        """Run an agent call once a slot under AGENT_MAX_CONCURRENT_CALLS is free"""
+        loop = asyncio.get_running_loop()
+        if self._call_limit_loop is not loop:
+            self._call_limit = asyncio.Semaphore(AGENT_MAX_CONCURRENT_CALLS)
+            self._call_limit_loop = loop
+        
+        async with self._call_limit:
+            return await self._dispatch(kind, args)
+    
+    async def _dispatch(self, kind: str, args: tuple):
+        """Run the agent call a request asks for"""
+        if kind == "research":
+            return await self.research_agent.process_research_query(*args)
+        if kind == "analysis":
+            return await self.analysis_agent.analyze_compound(*args)
+        if kind == "validation":
+            return await self.validation_agent.validate_clinical_data(*args)
+        raise ValueError(f"Unknown agent call: {kind}")
+    
     async def process_drug_discovery_query(self, query: str, compound_data: Optional[Dict] = None) -> Dict[str, Any]:
         """Process drug discovery queries using ADK agents"""
         if not self.is_available():
             return {
                 "error": "ADK agent system not available",
                 "response": "Google ADK agents require proper API configuration",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
         
         try:
@@ -242,14 +382,14 @@ class ADKAgentSystem:
                 "analysis_level": "comprehensive"
             }
             
-            response = await self.research_agent.process_research_query(query, context)
+            response = await self._submit("research", query, context)
             
             return {
                 "agent_type": "pharmaceutical_research",
                 "response": response.content,
                 "confidence": response.confidence if hasattr(response, 'confidence') else 0.9,
                 "sources": response.sources if hasattr(response, 'sources') else [],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
             
         except Exception as e:
@@ -257,7 +397,7 @@ class ADKAgentSystem:
             return {
                 "error": str(e),
                 "response": "Error processing drug discovery query",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
     
     async def analyze_compound_with_adk(self, smiles: str, prediction_results: Dict) -> Dict[str, Any]:
@@ -266,17 +406,17 @@ class ADKAgentSystem:
             return {
                 "error": "ADK agent system not available",
                 "analysis": "Google ADK agents require proper API configuration",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
         
         try:
-            response = await self.analysis_agent.analyze_compound(smiles, prediction_results)
+            response = await self._submit("analysis", smiles, prediction_results)
             
             return {
                 "agent_type": "molecular_analysis",
                 "analysis": response.content,
                 "molecular_insights": response.metadata if hasattr(response, 'metadata') else {},
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
             
         except Exception as e:
@@ -284,16 +424,21 @@ class ADKAgentSystem:
             return {
                 "error": str(e),
                 "analysis": "Error analyzing compound",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
     
-    async def orchestrate_multi_agent_research(self, compound_data: Dict, prediction_results: Dict) -> Dict[str, Any]:
-        """Orchestrate comprehensive research using multiple ADK agents"""
+    async def orchestrate_multi_agent_research(self, compound_data: Dict, prediction_results: Dict,
+                                               batch_mode: bool = False) -> Dict[str, Any]:
+        """Orchestrate comprehensive research using multiple ADK agents
+        
+        With batch_mode the three prompts go out as discounted Gemini batch jobs,
+        which can take minutes; use it only where no one is waiting on the result.
+        """
         if not self.is_available():
             return {
                 "error": "ADK agent system not available",
                 "report": "Google ADK multi-agent orchestration requires proper API configuration",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
         
         try:
@@ -303,19 +448,50 @@ class ADKAgentSystem:
                 "prediction_results": prediction_results,
                 "research_scope": "comprehensive_pharmaceutical_analysis"
             }
+            safety_profile = {
+                "admet_predictions": prediction_results.get("admet", {}),
+                "toxicity_signals": prediction_results.get("toxicity", {}),
+                "drug_interactions": prediction_results.get("interactions", {})
+            }
             
-            # Execute multi-agent orchestration
-            orchestration_result = await self.orchestrator.orchestrate(
-                query="Perform comprehensive pharmaceutical research and analysis",
-                context=research_context
-            )
+            research_query = "Perform comprehensive pharmaceutical research and analysis"
+            smiles = compound_data.get("smiles", "")
+            agent_names = ("research_agent", "analysis_agent", "validation_agent")
+            
+            if batch_mode:
+                contents = await self._run_agents_in_batch([
+                    (self.research_agent, research_query, research_context),
+                    (self.analysis_agent, *self.analysis_agent.compound_request(smiles, prediction_results)),
+                    (self.validation_agent, *self.validation_agent.validation_request(compound_data, safety_profile))
+                ])
+            else:
+                # Run the three agents concurrently under the shared call limit; one failing does not cancel the others
+                responses = await asyncio.gather(
+                    self._submit("research", research_query, research_context),
+                    self._submit("analysis", smiles, prediction_results),
+                    self._submit("validation", compound_data, safety_profile),
+                    return_exceptions=True
+                )
+                contents = [response if isinstance(response, Exception) else response.content
+                            for response in responses]
+            
+            research_findings = {}
+            failed_agents = []
+            for agent_name, content in zip(agent_names, contents):
+                if isinstance(content, Exception):
+                    logger.error(f"Error in {agent_name} during multi-agent orchestration: {content}")
+                    research_findings[agent_name] = {"error": str(content)}
+                    failed_agents.append(agent_name)
+                else:
+                    research_findings[agent_name] = content
             
             return {
-                "orchestration_type": "google_adk_multi_agent",
-                "research_findings": orchestration_result.responses,
-                "agent_coordination": orchestration_result.coordination_summary if hasattr(orchestration_result, 'coordination_summary') else "Multi-agent coordination completed",
-                "comprehensive_report": orchestration_result.final_report if hasattr(orchestration_result, 'final_report') else "Comprehensive pharmaceutical analysis completed",
-                "timestamp": datetime.now().isoformat()
+                "orchestration_type": "google_adk_multi_agent_batch" if batch_mode else "google_adk_multi_agent",
+                "research_findings": research_findings,
+                "agent_coordination": f"{len(agent_names) - len(failed_agents)} of {len(agent_names)} agents completed concurrently",
+                "comprehensive_report": "Comprehensive pharmaceutical analysis completed" if not failed_agents
+                                        else f"Analysis completed without: {', '.join(failed_agents)}",
+                "timestamp": _iso_now()
             }
             
         except Exception as e:
@@ -323,16 +499,35 @@ class ADKAgentSystem:
             return {
                 "error": str(e),
                 "report": "Error in multi-agent research orchestration",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
     
+    async def _run_agents_in_batch(self, requests: List[Tuple[Any, str, Dict[str, Any]]]) -> List[Any]:
+        """Send (agent, query, parameters) prompts as one batch job per model; returns texts or exceptions in order"""
+        by_model: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, (agent, query, parameters) in enumerate(requests):
+            by_model.setdefault(agent.MODEL, []).append(
+                (index, _batch_request(agent.system_instruction, query, parameters))
+            )
+        
+        job_results = await asyncio.gather(
+            *(_submit_batch(model, [request for _, request in items]) for model, items in by_model.items()),
+            return_exceptions=True
+        )
+        
+        contents: List[Any] = [None] * len(requests)
+        for items, job_result in zip(by_model.values(), job_results):
+            for position, (index, _) in enumerate(items):
+                contents[index] = job_result if isinstance(job_result, Exception) else job_result[position]
+        return contents
+    
     async def validate_with_clinical_agent(self, compound_data: Dict, prediction_results: Dict) -> Dict[str, Any]:
         """Validate compounds using clinical validation agent"""
         if not self.is_available():
             return {
                 "error": "ADK agent system not available",
                 "validation": "Clinical validation requires proper API configuration",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
         
         try:
@@ -342,14 +537,14 @@ class ADKAgentSystem:
                 "drug_interactions": prediction_results.get("interactions", {})
             }
             
-            response = await self.validation_agent.validate_clinical_data(compound_data, safety_profile)
+            response = await self._submit("validation", compound_data, safety_profile)
             
             return {
                 "agent_type": "clinical_validation",
                 "validation_report": response.content,
                 "safety_assessment": response.metadata if hasattr(response, 'metadata') else {},
                 "regulatory_insights": "Clinical validation completed with ADK agent",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
             
         except Exception as e:
@@ -357,7 +552,7 @@ class ADKAgentSystem:
             return {
                 "error": str(e),
                 "validation": "Error in clinical validation",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
     
     async def explain_results_with_adk(self, prediction_type: str, results: Dict) -> str:
@@ -366,31 +561,48 @@ class ADKAgentSystem:
             return "Google ADK explanation system requires proper API configuration."
         
         try:
-            query = f"Explain {prediction_type} prediction results in plain language"
-            context = {
-                "prediction_type": prediction_type,
-                "results": results,
-                "explanation_level": "patient_friendly"
-            }
-            
-            response = await self.research_agent.process_research_query(query, context)
+            query, context = self._explanation_request(prediction_type, results)
+            response = await self._submit("research", query, context)
             return response.content
             
         except Exception as e:
             logger.error(f"Error generating ADK explanation: {e}")
             return f"Error generating explanation for {prediction_type} results."
     
+    async def stream_explanation_with_adk(self, prediction_type: str, results: Dict) -> AsyncGenerator[str, None]:
+        """Generate explanations using ADK agents, yielding text as it is generated"""
+        if not self.is_available():
+            yield "Google ADK explanation system requires proper API configuration."
+            return
+        
+        try:
+            query, context = self._explanation_request(prediction_type, results)
+            async for text in self.research_agent.stream_research_query(query, context):
+                yield text
+            
+        except Exception as e:
+            logger.error(f"Error streaming ADK explanation: {e}")
+            yield f"Error generating explanation for {prediction_type} results."
+    
+    def _explanation_request(self, prediction_type: str, results: Dict) -> Tuple[str, Dict[str, Any]]:
+        """Build the research query and context for explaining prediction results"""
+        return f"Explain {prediction_type} prediction results in plain language", {
+            "prediction_type": prediction_type,
+            "results": results,
+            "explanation_level": "patient_friendly"
+        }
+    
     def get_adk_system_status(self) -> Dict[str, Any]:
         """Get status of ADK agent system"""
         return {
             "system_initialized": self.is_initialized,
             "api_configured": bool(os.getenv('GOOGLE_AI_API_KEY')),
-            "agents_available": {
-                "research_agent": hasattr(self, 'research_agent'),
-                "analysis_agent": hasattr(self, 'analysis_agent'),
-                "validation_agent": hasattr(self, 'validation_agent')
+            # Reported without building anything; built agents are cached in __dict__
+            "agents_loaded": {
+                "research_agent": 'research_agent' in self.__dict__,
+                "analysis_agent": 'analysis_agent' in self.__dict__,
+                "validation_agent": 'validation_agent' in self.__dict__
             },
-            "orchestrator_ready": hasattr(self, 'orchestrator'),
             "google_adk_version": "1.2.1",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _iso_now()
         }
\ No newline at end of file
@@ -32,6 +32,7 @@ try:
     from auth.external_db_connector import ExternalDBUserManager
     from auth.user_management import SubscriptionPlans
     from auth.landing_page import check_feature_access, render_access_denied
+    from auth.rate_limit import LoginRateLimited
     
     # Initialize database manager
     db_manager = ExternalDBUserManager()
@@ -1279,6 +1280,8 @@ def render_login_interface():
                     else:
                         st.error("Invalid email or password. Please check your credentials and try again.")
                         
+                except LoginRateLimited as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error("Authentication service unavailable. Please try again later.")
             else:
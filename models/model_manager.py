@@ -2,10 +2,32 @@
 Model Manager for PharmQAgentAI
 Handles model loading, caching, and management
 """
+import gc
 import os
+import sys
 import tempfile
+import threading
+import time
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+
+# Most models kept resident at once; the least recently used is evicted beyond this
+MAX_RESIDENT_MODELS = 5
+# Models unused for longer than this are unloaded on the next load
+MODEL_TTL_SECONDS = 3600
+
+def _release_memory():
+    """Collect freed model objects and return cached GPU memory
+    
+    torch is only consulted if something else already imported it; if it was
+    never imported there is no CUDA cache to release, and importing it here
+    would add seconds to a cold start.
+    """
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
 
 class ModelManager:
     """Manages AI models for pharmaceutical predictions"""
@@ -13,8 +35,13 @@ class ModelManager:
     def __init__(self):
         """Initialize the model manager"""
         self.temp_dir = tempfile.mkdtemp(prefix="pharmq_models_")
-        self.loaded_models = {}
+        self.loaded_models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.model_last_used: Dict[str, float] = {}
+        # Sessions holding each model; one session's unload leaves it loaded for the others
+        self.model_owners: Dict[str, Set[str]] = {}
         self.model_cache = {}
+        # Shared by every session thread; guards loaded_models, model_last_used and model_owners
+        self._lock = threading.Lock()
         
         # Setup logging
         logging.basicConfig(level=logging.INFO)
@@ -50,49 +77,117 @@ class ModelManager:
             return models.get(task, {})
         return models
     
-    def load_model(self, task: str, model_name: str) -> bool:
-        """Load a specific model"""
+    def load_model(self, task: str, model_name: str, model_config: Optional[Dict[str, Any]] = None,
+                   evict: bool = True, owner: Optional[str] = None) -> bool:
+        """Load a specific model
+        
+        At most MAX_RESIDENT_MODELS stay loaded; loading beyond that evicts the
+        least recently used model, and models idle for MODEL_TTL_SECONDS are
+        dropped first. Prediction calls pass evict=False so loading a default
+        model never pushes out one the user picked; such loads may briefly
+        exceed the cap until the next evicting load. An owner, such as a
+        session id, is recorded so release_model can tell who still uses it.
+        """
+        model_key = f"{task}_{model_name}"
         try:
-            model_key = f"{task}_{model_name}"
-            
-            if model_key in self.loaded_models:
-                self.logger.info(f"Model {model_key} already loaded")
-                return True
+            with self._lock:
+                now = time.monotonic()
+                if owner:
+                    self.model_owners.setdefault(model_key, set()).add(owner)
+                
+                if model_key in self.loaded_models:
+                    self.loaded_models.move_to_end(model_key)
+                    self.model_last_used[model_key] = now
+                    self.logger.info(f"Model {model_key} already loaded")
+                    return True
+                
+                evicted = self._evict_expired_models(now)
+                while evict and len(self.loaded_models) >= MAX_RESIDENT_MODELS:
+                    evicted.append(self._evict_model(next(iter(self.loaded_models))))
+                
+                # Simulate model loading
+                self.loaded_models[model_key] = {
+                    "task": task,
+                    "name": model_name,
+                    "config": model_config or {},
+                    "status": "loaded",
+                    "loaded_at": "2024-01-01"
+                }
+                self.model_last_used[model_key] = now
             
-            # Simulate model loading
-            self.loaded_models[model_key] = {
-                "task": task,
-                "name": model_name,
-                "status": "loaded",
-                "loaded_at": "2024-01-01"
-            }
+            if evicted:
+                _release_memory()
+                self.logger.info(f"Evicted models: {', '.join(evicted)}")
             
             self.logger.info(f"Successfully loaded model: {model_key}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to load model {task}_{model_name}: {e}")
+            self.logger.error(f"Failed to load model {model_key}: {e}")
             return False
     
+    def _evict_expired_models(self, now: float) -> List[str]:
+        """Unload models that have not been used within MODEL_TTL_SECONDS; caller holds the lock"""
+        expired = [key for key, last_used in self.model_last_used.items()
+                   if now - last_used > MODEL_TTL_SECONDS]
+        return [self._evict_model(model_key) for model_key in expired]
+    
+    def _evict_model(self, model_key: str) -> str:
+        """Drop a loaded model; caller holds the lock and releases memory afterwards"""
+        self.loaded_models.pop(model_key, None)
+        self.model_last_used.pop(model_key, None)
+        self.model_owners.pop(model_key, None)
+        return model_key
+    
     def is_model_loaded(self, task: str, model_name: str) -> bool:
         """Check if a model is loaded"""
         model_key = f"{task}_{model_name}"
         return model_key in self.loaded_models
     
     def get_loaded_models(self) -> Dict[str, Any]:
-        """Get all loaded models"""
-        return self.loaded_models
+        """Get a snapshot of all loaded models"""
+        with self._lock:
+            return dict(self.loaded_models)
     
     def unload_model(self, task: str, model_name: str) -> bool:
         """Unload a specific model"""
         model_key = f"{task}_{model_name}"
         
-        if model_key in self.loaded_models:
-            del self.loaded_models[model_key]
-            self.logger.info(f"Unloaded model: {model_key}")
-            return True
+        with self._lock:
+            if model_key not in self.loaded_models:
+                return False
+            self._evict_model(model_key)
+        
+        _release_memory()
+        self.logger.info(f"Unloaded model: {model_key}")
+        return True
+    
+    def release_model(self, task: str, model_name: str, owner: str) -> bool:
+        """Drop owner's hold on a model, unloading it once no owner remains
         
-        return False
+        Returns True if the model was unloaded.
+        """
+        model_key = f"{task}_{model_name}"
+        
+        with self._lock:
+            owners = self.model_owners.get(model_key, set())
+            owners.discard(owner)
+            if owners or model_key not in self.loaded_models:
+                return False
+            self._evict_model(model_key)
+        
+        _release_memory()
+        self.logger.info(f"Released and unloaded model: {model_key}")
+        return True
+    
+    def unload_all_models(self):
+        """Unload all loaded models"""
+        with self._lock:
+            self.loaded_models.clear()
+            self.model_last_used.clear()
+            self.model_owners.clear()
+        _release_memory()
+        self.logger.info("All models unloaded")
     
     def get_model_info(self, task: str, model_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific model"""
@@ -19,7 +19,7 @@ class PredictionTasks:
         """Predict Drug-Target Interaction"""
         try:
             # Ensure model is loaded
-            self.model_manager.load_model("DTI", model_name)
+            self.model_manager.load_model("DTI", model_name, evict=False)
             
             # Simulate prediction
             interaction_score = random.uniform(0.1, 0.95)
@@ -46,7 +46,7 @@ class PredictionTasks:
     def predict_dta(self, drug_smiles: str, target_sequence: str, model_name: str = "DeepDTA") -> Dict[str, Any]:
         """Predict Drug-Target Affinity"""
         try:
-            self.model_manager.load_model("DTA", model_name)
+            self.model_manager.load_model("DTA", model_name, evict=False)
             
             affinity_value = random.uniform(4.0, 9.5)
             
@@ -70,7 +70,7 @@ class PredictionTasks:
     def predict_ddi(self, drug1_smiles: str, drug2_smiles: str, model_name: str = "DrugBAN") -> Dict[str, Any]:
         """Predict Drug-Drug Interaction"""
         try:
-            self.model_manager.load_model("DDI", model_name)
+            self.model_manager.load_model("DDI", model_name, evict=False)
             
             interaction_risk = random.uniform(0.05, 0.9)
             severity = self._classify_ddi_severity(interaction_risk)
@@ -96,7 +96,7 @@ class PredictionTasks:
     def predict_admet(self, drug_smiles: str, model_name: str = "ADMETlab") -> Dict[str, Any]:
         """Predict ADMET Properties"""
         try:
-            self.model_manager.load_model("ADMET", model_name)
+            self.model_manager.load_model("ADMET", model_name, evict=False)
             
             result = {
                 "task": "ADMET",
@@ -138,7 +138,7 @@ class PredictionTasks:
     def predict_similarity(self, query_smiles: str, model_name: str = "MolBERT") -> Dict[str, Any]:
         """Predict Molecular Similarity"""
         try:
-            self.model_manager.load_model("Similarity", model_name)
+            self.model_manager.load_model("Similarity", model_name, evict=False)
             
             # Generate mock similar molecules
             similar_molecules = [
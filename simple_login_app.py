@@ -6,9 +6,9 @@ Minimal version for quick loading
 import streamlit as st
 import os
 import psycopg2
-import hashlib
 from datetime import datetime
 from dotenv import load_dotenv
+from auth.passwords import hash_password, verify_password, password_needs_rehash
 
 # Load environment variables
 load_dotenv()
@@ -20,10 +20,6 @@ st.set_page_config(
     layout="centered"
 )
 
-def hash_password(password: str) -> str:
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def authenticate_user(email: str, password: str):
     """Simple authentication against Neon database"""
     try:
@@ -34,14 +30,21 @@ def authenticate_user(email: str, password: str):
         conn = psycopg2.connect(database_url)
         cursor = conn.cursor()
         
-        password_hash = hash_password(password)
         cursor.execute("""
-            SELECT id, email, full_name, organization
+            SELECT id, email, full_name, organization, password_hash
             FROM pharmq_users 
-            WHERE email = %s AND password_hash = %s AND is_active = TRUE
-        """, (email, password_hash))
+            WHERE email = %s AND is_active = TRUE
+        """, (email,))
+        
+        row = cursor.fetchone()
+        user = row if verify_password(row[4] if row else None, password) else None
+        
+        # Upgrade legacy or outdated hashes now that the password is known
+        if user and password_needs_rehash(user[4]):
+            cursor.execute("UPDATE pharmq_users SET password_hash = %s WHERE id = %s",
+                           (hash_password(password), user[0]))
+            conn.commit()
         
-        user = cursor.fetchone()
         cursor.close()
         conn.close()
         
@@ -5,12 +5,15 @@ Input validation and data quality checks
 import re
 from typing import Dict, List, Any, Tuple
 
+SMILES_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789()[]=-#@+\\/:.')
+AMINO_ACIDS = frozenset('ACDEFGHIKLMNPQRSTVWY')
+
 class ValidationUtils:
     """Utility functions for input validation"""
     
     def __init__(self):
         """Initialize validation utilities"""
-        self.amino_acids = set('ACDEFGHIKLMNPQRSTVWY')
+        self.amino_acids = AMINO_ACIDS
     
     def validate_input_data(self, data: Dict[str, Any], task: str) -> Tuple[bool, str]:
         """Validate input data for specific prediction tasks"""
@@ -94,8 +97,7 @@ class ValidationUtils:
             return False
         
         # Basic SMILES validation
-        valid_chars = set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789()[]=-#@+\\/:.')
-        return all(c in valid_chars for c in smiles)
+        return SMILES_CHARS.issuperset(smiles)
     
     def validate_protein_sequence(self, sequence: str) -> bool:
         """Validate protein amino acid sequence"""
@@ -106,7 +108,7 @@ class ValidationUtils:
         if len(sequence) == 0:
             return False
         
-        return all(aa in self.amino_acids for aa in sequence)
+        return self.amino_acids.issuperset(sequence)
     
     def sanitize_input(self, text: str) -> str:
         """Sanitize text input"""